@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -27,6 +27,10 @@ class Settings(BaseSettings):
     PINECONE_ENVIRONMENT: str = ""
     PINECONE_INDEX_NAME: str = "resumematch"
     PINECONE_HOST: str = ""
+    VECTOR_STORE_DIR: str = "./vector_stores"  # One FAISS shard per user
+    ORPHAN_VECTOR_GRACE_SECONDS: int = 3600  # Vectors of resumes never committed are removed at startup after this long
+    VECTOR_SHARD_MEMORY_MB: int = 512  # LRU-evict cold shards above this budget
+    VECTOR_COMPACTION_THRESHOLD: float = 0.2  # Rebuild a shard once this fraction of rows is deleted
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -47,20 +51,52 @@ class Settings(BaseSettings):
     # File Upload
     MAX_FILE_SIZE_MB: int = 10
     UPLOAD_DIR: str = "./uploads"
+    UPLOAD_CHUNK_SIZE_KB: int = 1024  # Uploads are streamed to disk in chunks of this size
     
     # LLM Settings (for explanations and summaries)
     LLM_REPO_ID: str = "google/gemma-3-270m-it"  # Updated to Gemma 3 270M
     LLM_MAX_LENGTH: int = 512
     LLM_TEMPERATURE: float = 0.7
+    LLM_SUMMARY_MAX_NEW_TOKENS: int = 120  # Selection summaries are 2-3 sentences
+    LLM_SUMMARY_BATCH_SIZE: int = 8  # Top-N prompts generated per padded batch
+    LLM_OUTPUT_CACHE_ENABLED: bool = True  # Reuse generated summaries/explanations stored in llm_outputs
+    SUMMARY_POLL_INTERVAL_SECONDS: float = 1.0  # Summary stream DB poll interval
+    SUMMARY_STREAM_TIMEOUT_SECONDS: int = 600
+    SUMMARY_STALE_SECONDS: int = 900  # Matches still pending after this long are re-queued
+    WARMUP_ON_STARTUP: bool = True  # Load and warm models in parallel threads at startup
+    WARMUP_MODELS: List[str] = ["embeddings", "reranker", "summarizer", "llm"]
+    WARMUP_RETRY_MAX_SECONDS: float = 60.0  # Backoff cap for retrying failed warm-ups (and unreachable model servers); 0 = no retry
+    RAG_EXECUTOR_WORKERS: int = 8  # Threads for blocking RAG work awaited by async endpoints
+    RAG_STAGE_LIMITS: Dict[str, int] = {"parse": 4, "index": 2, "rank": 2, "generate": 1}  # Concurrent calls per stage
+    INGEST_WORKERS: int = 4  # Processes parsing uploaded PDFs in parallel; 0 = parse in the request's thread
+    OCR_WORKERS: int = 2  # Pages OCR'd concurrently per scanned PDF
+    OCR_DPI: int = 200  # Rasterization DPI for pages without a text layer
+    OCR_MIN_PAGE_CHARS: int = 20  # Pages with less extracted text than this are OCR'd
+    MODEL_SERVER_SOCKET: str = ""  # Unix socket of `python -m app.services.model_server`; empty = load models in-process
+    MICRO_BATCH_ENABLED: bool = True  # Coalesce concurrent embed/rerank calls into shared forward passes
+    MICRO_BATCH_MAX_ITEMS: int = 64  # Texts/pairs per coalesced forward pass
+    MICRO_BATCH_WINDOW_MS: float = 5.0  # How long to wait for other callers before running a batch
     
     # Embeddings & RAG Models (Matched with Demo Notebook)
     EMBEDDING_MODEL: str = "sentence-transformers/all-mpnet-base-v2"
     RERANKER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     SUMMARIZER_MODEL: str = "t5-small"
+    EMBEDDING_CACHE_PATH: str = "./vector_stores/embedding_cache.sqlite3"  # Empty to disable
+    QUERY_EMBEDDING_CACHE_SIZE: int = 256
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 3600
+    RERANK_CACHE_PATH: str = "./vector_stores/rerank_cache.sqlite3"  # Empty to disable
+    PARSE_CACHE_DIR: str = "./vector_stores/parse_cache"  # Parsed PDF artifacts by file hash; empty to disable
+    RERANK_BATCH_SIZE: int = 32  # Max pairs per CrossEncoder forward pass
+    RERANK_MAX_TOKENS: int = 512  # Capped to the model's own maximum
+    RERANK_TOKENS_PER_BATCH: int = 16384  # Padded-token budget; long buckets get smaller batches
+    RERANK_CHUNKS_PER_RESUME: int = 3  # Top FAISS passages scored per resume
+    RERANK_AGGREGATION: str = "max"  # max, mean_top2, weighted
+    RERANK_MAX_PAIRS: int = 150  # Cross-encoder pairs per request
     
     # Text Splitting
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 150
+    SKILL_TAXONOMY_PATH: str = ""  # JSON skill taxonomy; empty = bundled app/data/skill_taxonomy.json
     
     class Config:
         env_file = ".env"
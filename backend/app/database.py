@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, List
+from sqlalchemy import create_engine, insert, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
@@ -25,3 +26,29 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def bulk_insert(db, model, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert rows with one multi-row INSERT ... RETURNING id inside the caller's
+    transaction (no commit). Returns the new ids in the same order as rows.
+    """
+    if not rows:
+        return []
+    result = db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    return [row[0] for row in result.all()]
+
+
+def reserve_ids(db, model, count: int) -> List[int]:
+    """
+    Draw count ids from the table's PostgreSQL sequence without inserting rows.
+    nextval is not transactional, so ids are never handed out twice even if the
+    rows are never written; ids increase in allocation order.
+    """
+    if count <= 0:
+        return []
+    result = db.execute(
+        text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+        {"table": model.__tablename__, "count": count}
+    )
+    return [row[0] for row in result.all()]
@@ -4,11 +4,13 @@ from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 import time
 import logging
+import threading
+import asyncio
 from pathlib import Path
 import os
 
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal
 from app.routers import auth, jobs, resumes, analytics, chat, notifications, ranked_resumes, favorites, jd_generator, search
 
 # Setup logging
@@ -97,6 +99,49 @@ async def health_check():
     }
 
 
+_warmup = None
+_summary_sweep = None
+
+
+def model_warmup():
+    """Process-wide ModelWarmup, created on first use"""
+    global _warmup
+    if _warmup is None:
+        from app.services.rag_service import rag_service
+        from app.services.warmup import ModelWarmup
+        _warmup = ModelWarmup(rag_service, settings.WARMUP_MODELS)
+    return _warmup
+
+
+# Readiness endpoint: 200 only once the models are loaded and warm
+@app.get("/ready")
+async def readiness_check():
+    if not settings.WARMUP_ON_STARTUP:
+        return {"ready": True, "models": {}}
+    status = model_warmup().status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/executor-stats")
+async def executor_stats():
+    """Per-stage concurrency, queue depth and wait times of the RAG executor, plus micro-batching and ingestion counters"""
+    from app.services.rag_executor import rag_executor
+    from app.services.rag_service import rag_service
+    from app.services.ingestion import ingestion_pool
+    return {
+        **rag_executor.stats(),
+        "micro_batching": rag_service.batching_stats(),
+        "ingestion": ingestion_pool.stats()
+    }
+
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """Hit/miss counters for the RAG model caches"""
+    from app.services.rag_service import rag_service
+    return rag_service.cache_stats()
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -123,21 +168,56 @@ async def startup_event():
         logger.warning("   Then: sudo systemctl start postgresql")
         logger.warning("   Create DB: sudo -u postgres createdb resumematch")
 
-    # 2. Verify RAG Service
+    # 2. Warm up RAG models in parallel (readiness reported by /ready)
+    if settings.WARMUP_ON_STARTUP:
+        try:
+            model_warmup().start()
+        except Exception as e:
+            logger.error(f"❌ RAG Service initialization failed: {str(e)}")
+            logger.warning("⚠️  Application will run with limited AI features")
+
+    # 3. Drop vectors left behind by uploads that crashed before committing
+    threading.Thread(target=remove_orphan_vectors, name="orphan-vectors", daemon=True).start()
+
+    # 4. Re-queue summaries left pending by a worker that stopped mid-task
+    global _summary_sweep
+    _summary_sweep = asyncio.create_task(resumes.requeue_stale_summaries())
+
+
+def remove_orphan_vectors():
+    """Delete vectors whose resume rows were never committed"""
+    from app.services.rag_service import rag_service
+    from app.services.resume_store import orphaned_resume_ids
+    db = SessionLocal()
+    try:
+        orphans = orphaned_resume_ids(db, rag_service.shards.indexed_resume_ids(), settings.ORPHAN_VECTOR_GRACE_SECONDS)
+    except Exception as e:
+        logger.error(f"❌ Orphan vector check failed: {str(e)}")
+        return
+    finally:
+        db.close()
+    if orphans:
+        logger.info(f"🧹 Removing vectors of {len(orphans)} resumes that were never committed")
+        rag_service.delete_resumes(orphans)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist any vector shards with unsaved changes and stop the ingestion pool"""
     try:
         from app.services.rag_service import rag_service
-        logger.info("🤖 Verifying RAG Service...")
-        logger.info(f"   ✅ Embeddings Model: {rag_service.embeddings.model_name if rag_service.embeddings else 'Not loaded'}")
-        logger.info(f"   {'✅' if rag_service.reranker_available else '⚠️'} Reranker Available: {rag_service.reranker_available}")
-        logger.info(f"   {'✅' if rag_service.summarizer_available else '⚠️'} Summarizer Available: {rag_service.summarizer_available}")
-        if not rag_service.reranker_available:
-            logger.warning("   ⚠️  Reranker not available - match scoring will be limited")
-        if not rag_service.summarizer_available:
-            logger.warning("   ⚠️  Summarizer not available - summaries will be truncated")
-        logger.info("🚀 RAG Service ready!")
+        rag_service.shards.flush_all()
+        logger.info("💾 Vector shards flushed")
     except Exception as e:
-        logger.error(f"❌ RAG Service initialization failed: {str(e)}")
-        logger.warning("⚠️  Application will run with limited AI features")
+        logger.error(f"❌ Failed to flush vector shards: {str(e)}")
+    
+    if _warmup is not None:
+        _warmup.stop()
+    if _summary_sweep is not None:
+        _summary_sweep.cancel()
+    
+    from app.services.ingestion import ingestion_pool
+    ingestion_pool.shutdown()
 
 
 # Include routers
@@ -134,3 +134,50 @@ class Favorite(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'resume_id', name='_user_resume_uc'),
     )
+
+
+class LLMOutput(Base):
+    """Generated text cached by (model, prompt template version, job hash, resume hash, rank bucket)"""
+    __tablename__ = "llm_outputs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    model = Column(String, nullable=False)
+    template_version = Column(String, nullable=False)
+    job_hash = Column(String(64), nullable=False, index=True)
+    resume_hash = Column(String(64), nullable=False)
+    rank_bucket = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('model', 'template_version', 'job_hash', 'resume_hash', 'rank_bucket', name='_llm_output_key_uc'),
+    )
+
+
+class ResumeFile(Base):
+    """Content-addressed index of uploaded PDFs: one parsed resume per user and file hash"""
+    __tablename__ = "resume_files"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('user_id', 'sha256', name='_user_file_hash_uc'),
+    )
+
+
+class ResumeJob(Base):
+    """Jobs a resume was uploaded to; a re-uploaded resume gains a row here instead of a copy"""
+    __tablename__ = "resume_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint('resume_id', 'job_id', name='_resume_job_uc'),
+    )
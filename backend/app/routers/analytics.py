@@ -391,7 +391,7 @@ def get_ranked_overview(
     Get ranked analytics overview with score distribution and keyword matching.
     Handles edge cases and provides helpful error messages.
     """
-    from app.services.rag_service import rag_service
+    from app.services.rag_service import rag_service, build_job_query
     import logging
     
     logger = logging.getLogger(__name__)
@@ -483,8 +483,7 @@ def get_ranked_overview(
         })
     
     # Build job description
-    requirements_text = "\n".join(job.requirements) if job.requirements else ""
-    job_description = f"{job.title}\n{job.description}\nRequirements:\n{requirements_text}"
+    job_description = build_job_query(job)
     
     # Extract keywords from job requirements
     job_keywords = []
@@ -501,7 +500,8 @@ def get_ranked_overview(
             job_description=job_description,
             resumes=resume_dicts,
             top_k=top_k,
-            top_n=top_n
+            top_n=top_n,
+            explain=False  # The overview shows no explanations
         )
         
         ranked_resumes = result["ranked_resumes"]
@@ -7,6 +7,7 @@ from app.models import User, Resume, Job
 from app.schemas import ChatRequest, ChatResponse
 from app.auth import get_current_active_user
 from app.services.rag_service import rag_service
+from app.services.rag_executor import rag_executor
 
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
@@ -22,7 +23,7 @@ async def chat_query(
     
     try:
         # Use RAG service to query
-        result = rag_service.query(request.query, k=request.top_k)
+        result = await rag_executor.run("rank", rag_service.query, request.query, k=request.top_k, user_id=current_user.id)
         
         return ChatResponse(
             query=request.query,
@@ -64,7 +65,7 @@ async def ask_resume(
         context_query = f"Regarding the resume of {resume.candidate_name}: {request.query}"
         
         # Query RAG system
-        result = rag_service.query(context_query, k=request.top_k)
+        result = await rag_executor.run("rank", rag_service.query, context_query, k=request.top_k, resume_ids=[resume_id])
         
         return ChatResponse(
             query=request.query,
@@ -119,7 +120,7 @@ async def compare_resumes(
         comparison_text += f"Question: {request.query}"
         
         # Query RAG system
-        result = rag_service.query(comparison_text, k=len(resume_ids) * 2)
+        result = await rag_executor.run("rank", rag_service.query, comparison_text, k=len(resume_ids) * 2, resume_ids=resume_ids)
         
         return ChatResponse(
             query=request.query,
@@ -167,7 +168,7 @@ async def analyze_job(
         """
         
         # Query RAG system
-        result = rag_service.query(job_context, k=request.top_k)
+        result = await rag_executor.run("rank", rag_service.query, job_context, k=request.top_k, user_id=current_user.id)
         
         return ChatResponse(
             query=request.query,
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional
+from typing import AsyncIterator, Optional
+import json
+import asyncio
 import logging
+import threading
 
 from app.database import get_db
 from app.models import User
 from app.auth import get_current_user
 from app.services.rag_service import rag_service
+from app.services.rag_executor import rag_executor
 
 router = APIRouter(prefix="/jd-generator", tags=["Job Description Generator"])
 logger = logging.getLogger(__name__)
@@ -51,14 +56,15 @@ async def generate_job_description(
         
         logger.info(f"📝 Extracted keywords: {keywords}")
         
-        # Generate job description using LLM
-        if not rag_service.llm_available or not rag_service.llm:
+        # Generate job description using LLM (first access may load the model)
+        llm_available = await rag_executor.run("generate", lambda: rag_service.llm_available and rag_service.llm is not None)
+        if not llm_available:
             # Fallback: Generate basic description without LLM
             job_description = generate_fallback_description(request, keywords)
             logger.warning("⚠️ LLM not available, using fallback description")
         else:
             # Use LLM to generate professional description
-            job_description = generate_with_llm(request, keywords)
+            job_description = await rag_executor.run("generate", generate_with_llm, request, keywords)
             logger.info("✅ JD generated successfully with LLM")
         
         return JDGenerationResponse(
@@ -75,6 +81,33 @@ async def generate_job_description(
         )
 
 
+@router.post("/generate/stream")
+async def stream_job_description(
+    request: JDGenerationRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming variant of /generate: server-sent `header`, `token` and `done` events,
+    so the first bytes arrive before the LLM has finished.
+    """
+    logger.info(f"🎯 Streaming JD for: {request.job_title}")
+    
+    keywords = extract_keywords(
+        job_title=request.job_title,
+        department=request.department,
+        key_skills=request.key_skills
+    )
+    
+    logger.info(f"📝 Extracted keywords: {keywords}")
+    
+    return StreamingResponse(
+        stream_with_llm(request, keywords),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 def extract_keywords(job_title: str, department: str, key_skills: str) -> list[str]:
     """
     Extract relevant keywords from job inputs.
@@ -115,12 +148,8 @@ def extract_keywords(job_title: str, department: str, key_skills: str) -> list[s
     return unique_keywords
 
 
-def generate_with_llm(request: JDGenerationRequest, keywords: list[str]) -> str:
-    """
-    Generate job description using LLM with structured prompt.
-    Optimized for 400-500 words with faster generation.
-    """
-    
+def build_jd_messages(request: JDGenerationRequest, keywords: list[str]) -> list[dict]:
+    """Chat messages for the JD prompt (with a random variation seed for regeneration)"""
     import random
     
     # Add variety for regeneration
@@ -160,15 +189,85 @@ Format the output exactly as follows (start directly with section 1):
 
 Variation seed: {variety_seed}"""
 
+    # Format input as messages for the pipeline
+    return [
+        {"role": "user", "content": system_prompt}
+    ]
+
+
+def build_jd_header(request: JDGenerationRequest) -> str:
+    """Header block prepended to every generated description"""
+    # Bold the labels and the main title for emphasis
+    return f"""<b>{request.job_title}</b>
+
+<b>Department:</b> {request.department}
+
+<b>Experience:</b> {request.experience_level}
+
+<b>Type:</b> {request.employment_type}
+
+<b>Key Skills:</b> {request.key_skills}"""
+
+
+def clean_jd_body(response: str) -> str:
+    """Strip leaked prompt scaffolding and markdown from the raw LLM output"""
+    import re
+    
+    body = response.strip()
+    
+    # Remove "Structure" or "Format" lines if leaked
+    body = re.sub(r'Structure.*?:', '', body, flags=re.IGNORECASE)
+    body = re.sub(r'Format.*?:', '', body, flags=re.IGNORECASE)
+    body = re.sub(r'\(.*?words\):', '', body, flags=re.IGNORECASE)
+    
+    # Remove markdown formatting if present
+    body = body.replace('**', '')
+    body = body.replace('##', '')
+    body = body.replace('###', '')
+    return body
+
+
+def assemble_jd(request: JDGenerationRequest, keywords: list[str], response: str) -> str:
+    """Clean the LLM output, add the header and apply the length limits"""
+    logger.info(f"📏 Response length: {len(response)} characters")
+    
+    # Combine header and body
+    job_description = f"{build_jd_header(request)}\n\n{clean_jd_body(response)}"
+    
+    logger.info(f"🧹 Cleaned response length: {len(job_description)} characters")
+    
+    # Ensure minimum length (at least 200 chars)
+    if len(job_description) < 200:
+        logger.warning("⚠️ LLM response too short, using fallback")
+        return generate_fallback_description(request, keywords)
+    
+    # Truncate if too long (max ~700 words / 3500 chars)
+    if len(job_description) > 3500:
+        logger.info(f"✂️ Truncating response from {len(job_description)} to 3500 chars")
+        job_description = job_description[:3500] + "..."
+    
+    logger.info("=" * 80)
+    logger.info("✅ JOB DESCRIPTION GENERATED SUCCESSFULLY")
+    logger.info("=" * 80)
+    logger.info("\n📄 GENERATED CONTENT:")
+    logger.info("-" * 80)
+    logger.info(job_description)
+    logger.info("-" * 80)
+    
+    return job_description
+
+
+def generate_with_llm(request: JDGenerationRequest, keywords: list[str]) -> str:
+    """
+    Generate job description using LLM with structured prompt.
+    Optimized for 400-500 words with faster generation.
+    """
+    messages = build_jd_messages(request, keywords)
+
     try:
         logger.info("\n🔄 Calling Local LLM Pipeline...")
         logger.info("\n⏳ Generating... (this may take a while on CPU)")
         
-        # Format input as messages for the pipeline
-        messages = [
-            {"role": "user", "content": system_prompt}
-        ]
-        
         # Call local pipeline
         output = rag_service.llm(messages)
         
@@ -183,58 +282,7 @@ Variation seed: {variety_seed}"""
             raise ValueError("Unexpected output format from LLM pipeline")
         
         logger.info("✅ LLM response received!")
-        logger.info(f"📏 Response length: {len(response)} characters")
-        
-        # Clean up response
-        body = response.strip()
-        
-        # Remove "Structure" or "Format" lines if leaked
-        import re
-        body = re.sub(r'Structure.*?:', '', body, flags=re.IGNORECASE)
-        body = re.sub(r'Format.*?:', '', body, flags=re.IGNORECASE)
-        body = re.sub(r'\(.*?words\):', '', body, flags=re.IGNORECASE)
-        
-        # Remove markdown formatting if present
-        body = body.replace('**', '')
-        body = body.replace('##', '')
-        body = body.replace('###', '')
-        
-        # Construct the final output with the requested header pattern
-        # Bold the labels and the main title for emphasis
-        header = f"""<b>{request.job_title}</b>
-
-<b>Department:</b> {request.department}
-
-<b>Experience:</b> {request.experience_level}
-
-<b>Type:</b> {request.employment_type}
-
-<b>Key Skills:</b> {request.key_skills}"""
-
-        # Combine header and body
-        job_description = f"{header}\n\n{body}"
-        
-        logger.info(f"🧹 Cleaned response length: {len(job_description)} characters")
-        
-        # Ensure minimum length (at least 200 chars)
-        if len(job_description) < 200:
-            logger.warning("⚠️ LLM response too short, using fallback")
-            return generate_fallback_description(request, keywords)
-        
-        # Truncate if too long (max ~700 words / 3500 chars)
-        if len(job_description) > 3500:
-            logger.info(f"✂️ Truncating response from {len(job_description)} to 3500 chars")
-            job_description = job_description[:3500] + "..."
-        
-        logger.info("=" * 80)
-        logger.info("✅ JOB DESCRIPTION GENERATED SUCCESSFULLY")
-        logger.info("=" * 80)
-        logger.info("\n📄 GENERATED CONTENT:")
-        logger.info("-" * 80)
-        logger.info(job_description)
-        logger.info("-" * 80)
-        
-        return job_description
+        return assemble_jd(request, keywords, response)
         
     except Exception as e:
         logger.error("=" * 80)
@@ -244,6 +292,66 @@ Variation seed: {variety_seed}"""
         return generate_fallback_description(request, keywords)
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_with_llm(request: JDGenerationRequest, keywords: list[str]) -> AsyncIterator[str]:
+    """
+    Stream a job description as server-sent events.
+    
+    Events:
+    - header: the fixed header block, sent before generation starts
+    - token: raw text as the pipeline produces it
+    - done: the cleaned, assembled description (same post-processing as
+      generate_with_llm) and the extracted keywords; clients replace the
+      streamed text with it
+    """
+    yield _sse("header", {"text": build_jd_header(request), "extracted_keywords": keywords})
+    
+    # Generation runs on its own thread; hold a 'generate' slot for its whole duration
+    async with rag_executor.slot("generate"):
+        async for event in _stream_generation(request, keywords):
+            yield event
+
+
+async def _stream_generation(request: JDGenerationRequest, keywords: list[str]) -> AsyncIterator[str]:
+    llm_available = await asyncio.to_thread(lambda: rag_service.llm_available and rag_service.llm is not None)
+    if not llm_available:
+        logger.warning("⚠️ LLM not available, using fallback description")
+        description = generate_fallback_description(request, keywords)
+        yield _sse("done", {"job_description": description, "extracted_keywords": keywords, "success": True})
+        return
+    
+    messages = build_jd_messages(request, keywords)
+    cancelled = threading.Event()
+    
+    logger.info("\n🔄 Streaming from Local LLM Pipeline...")
+    
+    parts = []
+    tokens = rag_service.stream_llm(messages, cancelled=cancelled)
+    try:
+        try:
+            while True:
+                # Each next() blocks until the LLM produces more text; wait off the event loop
+                text = await asyncio.to_thread(next, tokens, None)
+                if text is None:
+                    break
+                parts.append(text)
+                yield _sse("token", {"text": text})
+        except Exception as e:
+            logger.error(f"❌ LLM STREAMING FAILED: {str(e)}")
+            logger.info("🔄 Falling back to template-based generation")
+            description = generate_fallback_description(request, keywords)
+        else:
+            logger.info("✅ LLM stream complete!")
+            description = assemble_jd(request, keywords, "".join(parts))
+        yield _sse("done", {"job_description": description, "extracted_keywords": keywords, "success": True})
+    finally:
+        # Stops generation if the client disconnected
+        cancelled.set()
+
+
 def generate_fallback_description(request: JDGenerationRequest, keywords: list[str]) -> str:
     """
     Generate a concise job description without LLM (fallback).
@@ -7,7 +7,7 @@ from app.database import get_db, SessionLocal
 from app.models import User, Job, Match, Resume
 from app.schemas import JobCreate, JobUpdate, JobResponse, MatchResponse
 from app.auth import get_current_active_user
-from app.services.rag_service import rag_service
+from app.services.rag_service import rag_service, build_job_query
 from app.routers.notifications import create_notification
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
@@ -76,6 +76,9 @@ def update_job(
             detail="Job not found"
         )
     
+    # The job text is changing, so its cached query embedding is stale
+    rag_service.invalidate_query(build_job_query(db_job))
+    
     # Update fields
     update_data = job_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -153,13 +156,10 @@ def analyze_resume_background(job_id: int, resume_id: int, db: Session):
     if not job or not resume:
         return
     
-    # Format requirements for matching
-    requirements_text = "\n".join(job.requirements) if job.requirements else ""
-    
     # Use RAG service to analyze match
     match_result = rag_service.analyze_resume_match(
         resume.text_content,
-        f"{job.title}\n{job.description}\nRequirements:\n{requirements_text}"
+        build_job_query(job)
     )
     
     match_score = match_result.get("match_score", 0)
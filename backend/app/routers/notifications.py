@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_db, bulk_insert
 from app.models import Notification, User
 from app.auth import get_current_user
 from pydantic import BaseModel
@@ -133,3 +133,13 @@ def create_notification(
     db.commit()
     db.refresh(notification)
     return notification
+
+
+def add_notifications(db: Session, notifications: List[Dict[str, Any]]) -> List[int]:
+    """
+    Stage notifications in the caller's transaction with a single INSERT.
+    Each dict takes user_id, title, message and optionally type and link.
+    The caller commits.
+    """
+    rows = [{"type": "info", "link": None, "is_read": False, **notification} for notification in notifications]
+    return bulk_insert(db, Notification, rows)
@@ -6,7 +6,8 @@ from app.database import get_db
 from app.models import User, Resume
 from app.schemas import RankedResumesRequest, RankedResumesResponse, RankedResumeItem
 from app.auth import get_current_active_user, get_optional_current_user
-from app.services.rag_service import rag_service
+from app.services.rag_service import rag_service, build_job_query, explanation_inputs
+from app.services.rag_executor import rag_executor
 import logging
 
 logger = logging.getLogger(__name__)
@@ -61,12 +62,23 @@ async def match_resumes(
         
         # Run the pipeline
         logger.info(f"Starting resume matching pipeline for {len(resumes)} resumes")
-        result = rag_service.match_resumes_to_job(
+        result = await rag_executor.run(
+            "rank",
+            rag_service.match_resumes_to_job,
             job_description=request.job_description,
             resumes=resume_dicts,
             top_k=request.top_k,
-            top_n=request.top_n
+            top_n=request.top_n,
+            explain=False
         )
+        explanations = await rag_executor.run(
+            "generate",
+            rag_service.generate_explanations,
+            request.job_description,
+            explanation_inputs(result["ranked_resumes"])
+        )
+        for r, explanation in zip(result["ranked_resumes"], explanations):
+            r["explanation"] = explanation
         
         # Convert to response format
         ranked_items = []
@@ -120,8 +132,7 @@ async def get_ranked_resumes_for_job(
         )
     
     # Build job description
-    requirements_text = "\n".join(job.requirements) if job.requirements else ""
-    job_description = f"{job.title}\n{job.description}\nRequirements:\n{requirements_text}"
+    job_description = build_job_query(job)
     
     # Use the match endpoint logic
     request = RankedResumesRequest(
@@ -1,26 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Tuple
 import os
+import json
+import time
 import shutil
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta, timezone
 import logging
 
-from app.database import get_db
-from app.models import User, Resume, Match, Job
-from app.schemas import ResumeResponse, FileUploadResponse, MatchResponse
+from app.database import get_db, SessionLocal, bulk_insert, reserve_ids
+from app.models import User, Resume, Match, Job, ResumeJob
+from app.schemas import ResumeResponse, FileUploadResponse, MatchResponse, BulkDeleteRequest
 from app.auth import get_current_active_user, get_optional_current_user
 from app.config import settings
-from app.services.rag_service import rag_service
-from app.routers.notifications import create_notification
+from app.services.rag_service import rag_service, build_job_query
+from app.services.rag_executor import rag_executor
+from app.services.ingestion import ingestion_pool
+from app.services.uploads import store_upload, UploadTooLarge
+from app.services.resume_store import (
+    find_resumes_by_hash, register_resume_files, associate_resumes_with_job,
+    forget_resumes, resume_texts as stored_resume_texts
+)
+from app.routers.notifications import add_notifications
 
 router = APIRouter(prefix="/resumes", tags=["Resumes"])
 logger = logging.getLogger(__name__)
 
+# Match.summary while its LLM summary is still being generated
+SUMMARY_PENDING = "Analyzing..."
+
 
 @router.post("/upload-and-rank")
 async def upload_and_rank_resumes(
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     job_title: str = Form(...),
     job_description: str = Form(...),
@@ -36,8 +52,9 @@ async def upload_and_rank_resumes(
     2. Runs FAISS search to find top K candidates
     3. Reranks using CrossEncoder
     4. Selects top N candidates
-    5. Generates LLM summaries explaining why each was selected
-    6. Stores results for analytics display
+    5. Stores results for analytics display and returns immediately
+    6. Generates LLM summaries in the background; poll /resumes/matches/summaries
+       or subscribe to /resumes/matches/summaries/stream for completion
     """
     
     logger.info("=" * 80)
@@ -70,229 +87,501 @@ async def upload_and_rank_resumes(
             db.commit()
             db.refresh(demo_user)
         current_user = demo_user
+    user_id = current_user.id
+    db.rollback()  # Release the user lookup's read transaction while uploads stream in
     
-    # Create a temporary job record for this ranking session
-    logger.info("📝 Creating job record...")
+    # The job, resumes, links, matches and notification are staged in memory and written
+    # in one transaction after ranking; none is held open while files are parsed, embedded
+    # and reranked
     job = Job(
-        user_id=current_user.id,
+        user_id=user_id,
         title=job_title,
         description=job_description,
         requirements=job_requirements.split('\n') if job_requirements else [],
         status='active'
     )
-    db.add(job)
-    db.commit()
-    db.refresh(job)
-    logger.info(f"✅ Job created (ID: {job.id})")
+    job_query = build_job_query(job)
     
     # STEP 1: Upload and process all resumes
     logger.info("\n" + "=" * 80)
     logger.info("STEP 1: UPLOADING AND PROCESSING RESUMES")
     logger.info("=" * 80)
     
-    uploaded_resumes = []
-    resume_texts = {}
+    resume_rows = []
+    resume_chunks = []
+    resume_hashes = []
+    saved_files = []  # (file, StoredUpload) in upload order
     
     for idx, file in enumerate(files, 1):
-        logger.info(f"\n📄 Processing file {idx}/{len(files)}: {file.filename}")
+        logger.info(f"\n📄 Receiving file {idx}/{len(files)}: {file.filename}")
         
         # Validate file type
         if not file.filename.endswith('.pdf'):
             logger.warning(f"⚠️  Skipping {file.filename} - not a PDF")
             continue
         
-        # Read and validate file size
-        content = await file.read()
-        file_size = len(content)
-        
-        if file_size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
-            logger.warning(f"⚠️  Skipping {file.filename} - exceeds size limit")
-            continue
-        
-        # Save file
+        # Stream to disk, enforcing the size limit as bytes arrive
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         safe_filename = f"{timestamp}_{idx}_{file.filename}"
-        file_path = os.path.join(settings.UPLOAD_DIR, safe_filename)
+        try:
+            stored = await store_upload(file, safe_filename, settings.MAX_FILE_SIZE_MB * 1024 * 1024)
+        except UploadTooLarge:
+            logger.warning(f"⚠️  Skipping {file.filename} - exceeds size limit")
+            continue
         
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
+        logger.info(f"  💾 Saved to: {safe_filename} ({stored.size} bytes, sha256 {stored.sha256[:12]})")
+        saved_files.append((file, stored))
+    
+    # Files this user already uploaded reuse their parsed resume; only new content is processed
+    reused_ids, new_files = _dedupe_uploads(db, user_id, saved_files)
+    db.rollback()  # End the read transaction before the long-running stages
+    
+    # Process every PDF in parallel and extract text, skills, education, experience and contact info
+    logger.info(f"\n🔍 Extracting text and fields from {len(new_files)} PDFs...")
+    parsed_results = await rag_executor.run(
+        "parse",
+        ingestion_pool.parse_many,
+        [stored.path for _, stored in new_files],
+        [stored.sha256 for _, stored in new_files]
+    )
+    
+    for (file, stored), parsed in zip(new_files, parsed_results):
+        logger.info(f"\n📄 {file.filename}")
+        if isinstance(parsed, Exception):
+            logger.error(f"  ❌ Error processing {file.filename}: {str(parsed)}")
+            os.remove(stored.path)
+            continue
         
-        logger.info(f"  💾 Saved to: {safe_filename}")
+        chunks = parsed["chunks"]
+        text_content = parsed["text"]
+        skills = parsed["skills"]
+        education = parsed["education"]
+        # Wrap in list to match schema expectation
+        education_list = [education] if education else []
+        experience = parsed["experience"]
+        contact_info = parsed["contact"]
         
-        # Process PDF and extract text
-        try:
-            logger.info(f"  🔍 Extracting text from PDF...")
-            chunks = rag_service.process_pdf(file_path)
-            text_content = " ".join([chunk.page_content for chunk in chunks])
-            
-            logger.info(f"  📊 Extracted {len(text_content)} characters")
-            
-            # Extract skills
-            logger.info(f"  🎯 Extracting skills...")
-            skills = rag_service.extract_skills(text_content)
-            logger.info(f"  ✅ Found {len(skills)} skills: {', '.join(skills[:5])}{'...' if len(skills) > 5 else ''}")
-            
-            # Extract education
-            logger.info(f"  🎓 Extracting education...")
-            education = rag_service.extract_education(text_content)
-            # Wrap in list to match schema expectation
-            education_list = [education] if education else []
-            logger.info(f"  ✅ Education: {education.get('degree', 'Not found') if education else 'Not found'}")
-            
-            # Extract experience
-            logger.info(f"  💼 Extracting experience...")
-            experience = rag_service.extract_experience(text_content)
-            logger.info(f"  ✅ Experience: {experience.get('years', 'Not found')} years")
-            
-            # Extract contact information (name, email, phone)
-            logger.info(f"  📧 Extracting contact information...")
-            contact_info = rag_service.extract_contact_info(text_content)
-            logger.info(f"  ✅ Contact: Name={contact_info.get('name', 'Not found')}, Email={contact_info.get('email', 'Not found')}")
-            
-            # Add to vector store
-            logger.info(f"  🔢 Adding to vector store...")
-            rag_service.add_to_vector_store(chunks)
-            
-        except Exception as e:
-            logger.error(f"  ❌ Error processing {file.filename}: {str(e)}")
-            os.remove(file_path)
-            continue
+        logger.info(f"  📊 Extracted {len(text_content)} characters")
+        logger.info(f"  ✅ Found {len(skills)} skills: {', '.join(skills[:5])}{'...' if len(skills) > 5 else ''}")
+        logger.info(f"  ✅ Education: {education.get('degree', 'Not found') if education else 'Not found'}")
+        logger.info(f"  ✅ Experience: {experience.get('years', 'Not found')} years")
+        logger.info(f"  ✅ Contact: Name={contact_info.get('name', 'Not found')}, Email={contact_info.get('email', 'Not found')}")
         
-        # Create resume record
-        resume = Resume(
-            user_id=current_user.id,
-            job_id=job.id,
+        # Stage resume record; all rows are inserted together below
+        resume_rows.append(dict(
+            user_id=user_id,
             candidate_name=contact_info.get('name'),
             candidate_email=contact_info.get('email'),
             candidate_phone=contact_info.get('phone'),
             file_name=file.filename,
-            file_path=file_path,
-            file_size=file_size,
+            file_path=stored.path,
+            file_size=stored.size,
             text_content=text_content,
             extracted_skills=skills,
             extracted_education=education_list,  # Store education as list
             extracted_experience=experience,
             status="processed"
-        )
-        
-        db.add(resume)
-        db.commit()
-        db.refresh(resume)
-        
-        uploaded_resumes.append(resume)
-        resume_texts[resume.id] = text_content
-        
-        logger.info(f"  ✅ Resume saved (ID: {resume.id})")
-    
-    logger.info(f"\n✅ STEP 1 COMPLETE: {len(uploaded_resumes)} resumes processed")
+        ))
+        resume_chunks.append(chunks)
+        resume_hashes.append(stored.sha256)
     
-    if len(uploaded_resumes) == 0:
+    if len(resume_rows) == 0 and len(reused_ids) == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No valid resumes were uploaded"
         )
     
+    # The vectors are tagged with resume ids before the rows exist, so draw the ids from the
+    # sequence now. If the upload never commits, the ids are skipped and the vectors removed.
+    file_paths = [row["file_path"] for row in resume_rows]
+    try:
+        new_resume_ids = reserve_ids(db, Resume, len(resume_rows))
+        resume_texts = {resume_id: row["text_content"] for resume_id, row in zip(new_resume_ids, resume_rows)}
+        resume_texts.update(stored_resume_texts(db, reused_ids))
+        db.rollback()
+    except Exception as e:
+        logger.error(f"❌ Failed to reserve resume ids: {str(e)}")
+        await _abort_upload(db, file_paths, [])
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Storing resumes failed: {str(e)}"
+        )
+    for resume_id, row in zip(new_resume_ids, resume_rows):
+        row["id"] = resume_id
+    logger.info(f"  ✅ {len(new_resume_ids)} new resumes staged, {len(reused_ids)} reused")
+    
+    # Embed every chunk of the new resumes in one pass and append to the user's shard
+    if new_resume_ids:
+        try:
+            logger.info(f"\n🔢 Adding {len(new_resume_ids)} resumes to vector store...")
+            await rag_executor.run("index", rag_service.add_resumes_to_vector_store, list(zip(new_resume_ids, resume_chunks)), user_id=user_id)
+        except Exception as e:
+            logger.error(f"❌ Error indexing resumes: {str(e)}")
+            await _abort_upload(db, file_paths, new_resume_ids)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Indexing failed: {str(e)}"
+            )
+    
+    logger.info(f"\n✅ STEP 1 COMPLETE: {len(resume_texts)} resumes processed")
+    
     # STEP 2: Run RAG Pipeline - FAISS Search + Reranking
     logger.info("\n" + "=" * 80)
     logger.info("STEP 2: RUNNING RAG PIPELINE (FAISS + RERANKING)")
     logger.info("=" * 80)
     
-    # Build job query
-    requirements_text = "\n".join(job.requirements) if job.requirements else ""
-    job_query = f"{job.title}\n{job.description}\nRequirements:\n{requirements_text}"
-    
     logger.info(f"🔍 Job Query Length: {len(job_query)} characters")
     
     # Run complete RAG pipeline with ranking
     logger.info(f"\n🤖 Running RAG pipeline...")
-    logger.info(f"  - FAISS search for top {min(50, len(uploaded_resumes))} candidates")
+    logger.info(f"  - FAISS search for top {min(50, len(resume_texts))} candidates")
     logger.info(f"  - CrossEncoder reranking")
     logger.info(f"  - Selecting top {top_n} candidates")
     
     try:
-        ranked_results = rag_service.rank_resumes_with_summaries(
+        # Summaries are generated after the response by fill_match_summaries
+        ranked_results = await rag_executor.run(
+            "rank",
+            rag_service.rank_resumes_with_summaries,
             job_description=job_query,
             resume_texts=resume_texts,
-            top_k=min(50, len(uploaded_resumes)),
-            top_n=top_n
+            top_k=min(50, len(resume_texts)),
+            top_n=top_n,
+            with_summaries=False
         )
         
         logger.info(f"\n✅ STEP 2 COMPLETE: {len(ranked_results)} candidates ranked")
         
     except Exception as e:
         logger.error(f"❌ RAG pipeline failed: {str(e)}")
+        await _abort_upload(db, file_paths, new_resume_ids)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ranking failed: {str(e)}"
         )
     
-    # STEP 3: Store Match Results with LLM Summaries
+    # STEP 3: Store Match Results (summaries pending)
     logger.info("\n" + "=" * 80)
     logger.info("STEP 3: STORING RANKED RESULTS")
     logger.info("=" * 80)
     
+    match_rows = []
     for rank, result in enumerate(ranked_results, 1):
         resume_id = result['resume_id']
         score = result['score']
-        summary = result['summary']
         skills = result.get('skills', [])  # Get skills from result
         
         logger.info(f"\n🏆 Rank #{rank}")
         logger.info(f"  Resume ID: {resume_id}")
         logger.info(f"  Score: {score:.4f}")
-        logger.info(f"  Summary: {summary}")
         logger.info(f"  Skills: {', '.join(skills) if skills else 'No skills extracted'}")
         
-        # Create match record with skills from result
-        match = Match(
-            job_id=job.id,
+        # Stage match record with a placeholder summary, filled in the background
+        match_rows.append(dict(
             resume_id=resume_id,
             match_score=int(score * 100),  # Convert to percentage
             skills_match={"matched_skills": skills},  # Use skills from RAG result
-            summary=summary,
+            summary=SUMMARY_PENDING,
             status="ranked"
-        )
-        
-        db.add(match)
+        ))
     
-    db.commit()
+    # One transaction for the job, resumes, file hashes, job links, matches and notification
+    try:
+        db.add(job)
+        db.flush()
+        job_id = job.id
+        for row in resume_rows + match_rows:
+            row["job_id"] = job_id
+        bulk_insert(db, Resume, resume_rows)
+        register_resume_files(db, user_id, dict(zip(new_resume_ids, resume_hashes)))
+        associate_resumes_with_job(db, job_id, new_resume_ids + reused_ids)
+        match_ids = bulk_insert(db, Match, match_rows)
+        add_notifications(db, [dict(
+            user_id=user_id,
+            title="Resume Ranking Complete",
+            message=f"Ranked top {len(ranked_results)} candidates for '{job_title}'",
+            type="match",
+            link=f"/analytics"
+        )])
+        db.commit()
+    except IntegrityError:
+        # The same file was registered by a concurrent upload (or a reused resume was deleted)
+        await _abort_upload(db, file_paths, new_resume_ids)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Some of these resumes are being uploaded by another request, please retry"
+        )
+    except Exception as e:
+        logger.error(f"❌ Failed to store ranking results: {str(e)}")
+        await _abort_upload(db, file_paths, new_resume_ids)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Storing results failed: {str(e)}"
+        )
+    await rag_executor.run("index", rag_service.flush_vector_store, user_id)
     logger.info(f"\n✅ STEP 3 COMPLETE: {len(ranked_results)} matches stored")
     
-    # Create notification
-    create_notification(
-        db=db,
-        user_id=current_user.id,
-        title="Resume Ranking Complete",
-        message=f"Ranked top {len(ranked_results)} candidates for '{job.title}'",
-        notification_type="match",
-        link=f"/analytics"
+    # STEP 4: Generate summaries after the response has been sent
+    background_tasks.add_task(
+        fill_match_summaries,
+        job_query,
+        [(match_id, r['score']) for match_id, r in zip(match_ids, ranked_results)]
     )
+    logger.info(f"⏳ {len(match_ids)} summaries scheduled for background generation")
     
     logger.info("\n" + "=" * 80)
     logger.info("✅ UPLOAD AND RANK PIPELINE COMPLETED SUCCESSFULLY")
     logger.info("=" * 80)
-    logger.info(f"📊 Total Resumes: {len(uploaded_resumes)}")
+    logger.info(f"📊 Total Resumes: {len(resume_texts)}")
     logger.info(f"🏆 Top Ranked: {len(ranked_results)}")
-    logger.info(f"💼 Job ID: {job.id}")
+    logger.info(f"💼 Job ID: {job_id}")
     logger.info("=" * 80 + "\n")
     
     return {
-        "message": f"Successfully ranked {len(ranked_results)} out of {len(uploaded_resumes)} resumes",
-        "job_id": job.id,
-        "total_resumes": len(uploaded_resumes),
+        "message": f"Successfully ranked {len(ranked_results)} out of {len(resume_texts)} resumes",
+        "job_id": job_id,
+        "total_resumes": len(resume_texts),
         "ranked_count": len(ranked_results),
+        "summaries_stream": f"{settings.API_V1_PREFIX}/resumes/matches/summaries/stream?match_ids={','.join(map(str, match_ids))}",
         "top_candidates": [
             {
                 "rank": idx + 1,
                 "resume_id": r['resume_id'],
+                "match_id": match_id,
                 "score": r['score'],
-                "summary": r['summary']
+                "summary": SUMMARY_PENDING,
+                "summary_status": "pending"
             }
-            for idx, r in enumerate(ranked_results)
+            for idx, (r, match_id) in enumerate(zip(ranked_results, match_ids))
         ]
     }
 
 
+async def fill_match_summaries(job_query: str, ranked_matches: List[Tuple[int, float]]):
+    """
+    Background task: generate selection summaries for ranked matches and write
+    them to the Match rows one LLM batch at a time, so clients see progress.
+    Generation runs in the RAG executor's "generate" stage, sharing its limit with
+    the other LLM endpoints; no DB session is held while a batch generates.
+    
+    Args:
+        job_query: Job text the matches were ranked against
+        ranked_matches: (match_id, normalized rerank score) in rank order
+    """
+    batch_size = max(1, settings.LLM_SUMMARY_BATCH_SIZE)
+    written = 0
+    try:
+        for start in range(0, len(ranked_matches), batch_size):
+            batch = ranked_matches[start:start + batch_size]
+            db = SessionLocal()
+            try:
+                matches = {
+                    match.id: match
+                    for match in db.query(Match).filter(Match.id.in_([match_id for match_id, _ in batch])).all()
+                }
+                # Matches deleted while waiting are skipped
+                batch = [(match_id, score) for match_id, score in batch if match_id in matches]
+                candidates = [
+                    {
+                        'text': matches[match_id].resume.text_content or "",
+                        'rerank_score': score,
+                        'skills': (matches[match_id].skills_match or {}).get('matched_skills', []),
+                        'rank': start + offset + 1
+                    }
+                    for offset, (match_id, score) in enumerate(batch)
+                ]
+            finally:
+                db.close()
+            if not batch:
+                continue
+            
+            try:
+                summaries = await rag_executor.run("generate", rag_service.generate_selection_summaries, job_query, candidates)
+            except Exception as e:
+                logger.error(f"❌ Summary generation failed: {str(e)}")
+                summaries = [fallback_summary(cand['rerank_score']) for cand in candidates]
+            
+            db = SessionLocal()
+            try:
+                for (match_id, _), summary in zip(batch, summaries):
+                    db.query(Match).filter(Match.id == match_id).update({"summary": summary}, synchronize_session=False)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            logger.info(f"📝 Summaries ready for matches {[match_id for match_id, _ in batch]}")
+            written = start + batch_size
+    except Exception as e:
+        logger.error(f"❌ Background summary worker failed: {str(e)}")
+        write_fallback_summaries(ranked_matches[written:])
+
+
+def fallback_summary(score: float) -> str:
+    """Summary written when the LLM could not produce one"""
+    return f"Strong candidate with {score:.1%} match score based on semantic similarity."
+
+
+def write_fallback_summaries(ranked_matches: List[Tuple[int, float]]):
+    """Replace SUMMARY_PENDING with the fallback summary so clients stop waiting"""
+    db = SessionLocal()
+    try:
+        for match_id, score in ranked_matches:
+            db.query(Match).filter(
+                Match.id == match_id, Match.summary == SUMMARY_PENDING
+            ).update({"summary": fallback_summary(score)}, synchronize_session=False)
+        db.commit()
+        logger.info(f"📝 Fallback summaries written for {len(ranked_matches)} matches")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Could not write fallback summaries: {str(e)}")
+    finally:
+        db.close()
+
+
+async def requeue_stale_summaries():
+    """
+    Re-run summary generation for matches left at SUMMARY_PENDING longer than
+    SUMMARY_STALE_SECONDS, e.g. by a worker that restarted mid-task. Runs at
+    startup and then once per interval. Each sweep claims its rows by bumping
+    updated_at, so concurrent workers do not pick up the same matches.
+    """
+    while True:
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.SUMMARY_STALE_SECONDS)
+            db = SessionLocal()
+            try:
+                claimed = db.execute(
+                    update(Match)
+                    .where(
+                        Match.summary == SUMMARY_PENDING,
+                        func.coalesce(Match.updated_at, Match.created_at) < cutoff
+                    )
+                    .values(updated_at=func.now())
+                    .returning(Match.id, Match.job_id, Match.match_score)
+                ).all()
+                db.commit()
+                by_job = {}
+                for match_id, job_id, match_score in claimed:
+                    by_job.setdefault(job_id, []).append((match_id, (match_score or 0) / 100))
+                jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_(list(by_job))).all()} if by_job else {}
+                job_queries = {job_id: build_job_query(job) for job_id, job in jobs.items()}
+            finally:
+                db.close()
+            
+            if claimed:
+                logger.info(f"🔁 Re-queuing summaries for {len(claimed)} stale matches")
+            for job_id, ranked_matches in by_job.items():
+                ranked_matches.sort(key=lambda item: item[1], reverse=True)
+                if job_id in job_queries:
+                    await fill_match_summaries(job_queries[job_id], ranked_matches)
+                else:
+                    write_fallback_summaries(ranked_matches)
+        except Exception as e:
+            logger.error(f"❌ Stale summary sweep failed: {str(e)}")
+        await asyncio.sleep(settings.SUMMARY_STALE_SECONDS)
+
+
+def _summary_state(match: Match) -> dict:
+    ready = match.summary != SUMMARY_PENDING
+    return {
+        "match_id": match.id,
+        "resume_id": match.resume_id,
+        "summary_status": "ready" if ready else "pending",
+        "summary": match.summary if ready else None
+    }
+
+
+def _owned_matches(db: Session, match_ids: List[int], current_user: Optional[User]) -> List[Match]:
+    """Matches with the given ids on jobs owned by the caller (or the demo user)"""
+    if not current_user:
+        if not settings.ENABLE_DEMO_MODE:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required"
+            )
+        current_user = db.query(User).filter(User.email == "demo@example.com").first()
+        if not current_user:
+            return []
+    return db.query(Match).join(Job).filter(
+        Match.id.in_(match_ids),
+        Job.user_id == current_user.id
+    ).all()
+
+
+@router.get("/matches/summaries")
+def get_match_summaries(
+    match_ids: str,
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: Session = Depends(get_db)
+):
+    """Poll summary generation for comma-separated match ids from upload-and-rank"""
+    ids = _parse_match_ids(match_ids)
+    matches = _owned_matches(db, ids, current_user)
+    states = [_summary_state(match) for match in matches]
+    return {
+        "complete": all(state["summary_status"] == "ready" for state in states),
+        "matches": states
+    }
+
+
+@router.get("/matches/summaries/stream")
+async def stream_match_summaries(
+    match_ids: str,
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Server-sent events: one `summary` event per match as its summary becomes ready,
+    then a `done` event once all are ready (or after SUMMARY_STREAM_TIMEOUT_SECONDS).
+    """
+    ids = [match.id for match in _owned_matches(db, _parse_match_ids(match_ids), current_user)]
+    
+    async def events():
+        pending = set(ids)
+        deadline = time.monotonic() + settings.SUMMARY_STREAM_TIMEOUT_SECONDS
+        while pending and time.monotonic() < deadline:
+            poll_db = SessionLocal()
+            try:
+                matches = poll_db.query(Match).filter(Match.id.in_(pending)).all()
+                found = {match.id for match in matches}
+                # Deleted matches will never complete
+                pending &= found
+                for match in matches:
+                    state = _summary_state(match)
+                    if state["summary_status"] == "ready":
+                        pending.discard(match.id)
+                        yield f"event: summary\ndata: {json.dumps(state)}\n\n"
+            finally:
+                poll_db.close()
+            if pending:
+                await asyncio.sleep(settings.SUMMARY_POLL_INTERVAL_SECONDS)
+        yield f"event: done\ndata: {json.dumps({'pending': sorted(pending)})}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _parse_match_ids(match_ids: str) -> List[int]:
+    try:
+        ids = [int(part) for part in match_ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="match_ids must be comma-separated integers"
+        )
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No match ids given"
+        )
+    return ids
+
+
 # Keep existing upload endpoint for backward compatibility
 @router.post("/upload", response_model=List[FileUploadResponse])
 async def upload_resumes(
@@ -328,8 +617,15 @@ async def upload_resumes(
             db.commit()
             db.refresh(demo_user)
         current_user = demo_user
+    user_id = current_user.id
+    db.rollback()  # Release the user lookup's read transaction while uploads stream in
     
     uploaded_files = []
+    resume_rows = []
+    resume_chunks = []
+    resume_hashes = []
+    saved_paths = []
+    saved_files = []  # (file, StoredUpload) in upload order
     
     for file in files:
         # Validate file type
@@ -338,91 +634,183 @@ async def upload_resumes(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Only PDF files are allowed. {file.filename} is not a PDF."
             )
+    
+    for file in files:
+        # Create unique filename
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_filename = f"{timestamp}_{len(saved_paths) + 1}_{file.filename}"
         
-        # Validate file size
-        file_size = 0
-        content = await file.read()
-        file_size = len(content)
-        
-        if file_size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
+        # Stream to disk, enforcing the size limit as bytes arrive
+        try:
+            stored = await store_upload(file, safe_filename, settings.MAX_FILE_SIZE_MB * 1024 * 1024)
+        except UploadTooLarge:
+            _remove_files(saved_paths)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File {file.filename} exceeds maximum size of {settings.MAX_FILE_SIZE_MB}MB"
             )
-        
-        # Create unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"{timestamp}_{file.filename}"
-        file_path = os.path.join(settings.UPLOAD_DIR, safe_filename)
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-        
-        # Process PDF and extract text
-        try:
-            chunks = rag_service.process_pdf(file_path)
-            text_content = " ".join([chunk.page_content for chunk in chunks])
-            
-            # Extract skills using RAG
-            skills = rag_service.extract_skills(text_content)
-            
-            # Extract education
-            education = rag_service.extract_education(text_content)
-            # Wrap in list to match schema expectation
-            education_list = [education] if education else []
-            logger.info(f"  🎓 Education extracted: {education.get('degree', 'Not found') if education else 'Not found'}")
-            
-            # Extract contact information (name, email, phone)
-            contact_info = rag_service.extract_contact_info(text_content)
-            logger.info(f"  📧 Contact info extracted: Name={contact_info.get('name', 'Not found')}, Email={contact_info.get('email', 'Not found')}")
-            
-            # Add to vector store
-            rag_service.add_to_vector_store(chunks)
-            
-        except Exception as e:
-            # Clean up file if processing fails
-            logger.error(f"❌ Error processing {file.filename}: {str(e)}")
-            os.remove(file_path)
+        saved_paths.append(stored.path)
+        saved_files.append((file, stored))
+    
+    # Files this user already uploaded reuse their parsed resume; only new content is processed
+    reused_ids, new_files = _dedupe_uploads(db, user_id, saved_files)
+    db.rollback()  # End the read transaction before parsing
+    saved_paths = [stored.path for _, stored in new_files]
+    
+    # Process every PDF in parallel and extract text
+    parsed_results = await rag_executor.run(
+        "parse",
+        ingestion_pool.parse_many,
+        saved_paths,
+        [stored.sha256 for _, stored in new_files]
+    )
+    
+    for (file, stored), parsed in zip(new_files, parsed_results):
+        if isinstance(parsed, Exception):
+            # Clean up this request's files if processing fails (nothing is committed yet)
+            logger.error(f"❌ Error processing {file.filename}: {str(parsed)}")
+            _remove_files(saved_paths)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error processing {file.filename}: {str(e)}"
+                detail=f"Error processing {file.filename}: {str(parsed)}"
             )
         
-        # Create resume record
-        logger.info(f"💾 Creating resume record for {file.filename}")
-        resume = Resume(
-            user_id=current_user.id,
+        chunks = parsed["chunks"]
+        text_content = parsed["text"]
+        skills = parsed["skills"]
+        
+        education = parsed["education"]
+        # Wrap in list to match schema expectation
+        education_list = [education] if education else []
+        logger.info(f"  🎓 Education extracted: {education.get('degree', 'Not found') if education else 'Not found'}")
+        
+        contact_info = parsed["contact"]
+        logger.info(f"  📧 Contact info extracted: Name={contact_info.get('name', 'Not found')}, Email={contact_info.get('email', 'Not found')}")
+        
+        # Stage resume record; all rows are inserted together below
+        logger.info(f"💾 Staging resume record for {file.filename}")
+        resume_rows.append(dict(
+            user_id=user_id,
             job_id=job_id,
             candidate_name=contact_info.get('name'),
             candidate_email=contact_info.get('email'),
             candidate_phone=contact_info.get('phone'),
             file_name=file.filename,
-            file_path=file_path,
-            file_size=file_size,
+            file_path=stored.path,
+            file_size=stored.size,
             text_content=text_content,
             extracted_skills=skills,
             extracted_education=education_list,  # Store education as list
             status="processed"
-        )
-        
-        db.add(resume)
-        db.commit()
-        db.refresh(resume)
+        ))
+        resume_chunks.append(chunks)
+        resume_hashes.append(stored.sha256)
         
-        logger.info(f"✅ Successfully processed {file.filename} (Resume ID: {resume.id})")
+        logger.info(f"✅ Successfully processed {file.filename}")
+    
+    new_paths = set(saved_paths)
+    for file, stored in saved_files:
         uploaded_files.append(FileUploadResponse(
             file_name=file.filename,
-            file_size=file_size,
+            file_size=stored.size,
             status="success",
-            message="Resume uploaded and processed successfully"
+            message="Resume uploaded and processed successfully" if stored.path in new_paths
+            else "Duplicate of a resume you already uploaded; reused its processed data"
         ))
     
+    # One multi-row INSERT ... RETURNING, committed before indexing so vectors only ever
+    # carry ids of rows that exist; then embed every chunk of the new resumes in one pass
+    if resume_rows or reused_ids:
+        try:
+            resume_ids = bulk_insert(db, Resume, resume_rows)
+            register_resume_files(db, user_id, dict(zip(resume_ids, resume_hashes)))
+            linked_ids = associate_resumes_with_job(db, job_id, resume_ids + reused_ids)
+            db.commit()
+        except IntegrityError:
+            # The same file was registered by a concurrent upload
+            await _abort_upload(db, saved_paths, [])
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Some of these resumes are being uploaded by another request, please retry"
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to store resumes: {str(e)}")
+            await _abort_upload(db, saved_paths, [])
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Storing resumes failed: {str(e)}"
+            )
+        if resume_ids:
+            try:
+                await rag_executor.run("index", rag_service.add_resumes_to_vector_store, list(zip(resume_ids, resume_chunks)), user_id=user_id)
+            except Exception as e:
+                logger.error(f"❌ Error indexing resumes: {str(e)}")
+                _delete_upload_rows(db, resume_ids, job_id, linked_ids)
+                await _abort_upload(db, saved_paths, resume_ids)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error indexing resumes: {str(e)}"
+                )
+            await rag_executor.run("index", rag_service.flush_vector_store, user_id)
+    
     logger.info(f"✨ Upload complete: {len(uploaded_files)} files processed successfully")
     return uploaded_files
 
 
 
+def _remove_files(paths: List[str]):
+    """Delete files saved by a request that is being aborted"""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def _abort_upload(db: Session, file_paths: List[str], resume_ids: List[int]):
+    """Roll back an upload's transaction and drop its files and any vectors already indexed"""
+    db.rollback()
+    _remove_files(file_paths)
+    if resume_ids:
+        await rag_executor.run("index", rag_service.delete_resumes, resume_ids)
+
+
+def _delete_upload_rows(db: Session, resume_ids: List[int], job_id: Optional[int], linked_ids: List[int]):
+    """Delete the committed rows of an /upload whose resumes could not be indexed"""
+    try:
+        db.rollback()
+        if job_id is not None and linked_ids:
+            db.query(ResumeJob).filter(
+                ResumeJob.job_id == job_id,
+                ResumeJob.resume_id.in_(linked_ids)
+            ).delete(synchronize_session=False)
+        forget_resumes(db, resume_ids)
+        db.query(Resume).filter(Resume.id.in_(resume_ids)).delete(synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        logger.error(f"❌ Failed to delete rows of resumes {resume_ids}: {str(e)}")
+        db.rollback()
+
+
+def _dedupe_uploads(db: Session, user_id: int, saved_files: List[tuple]) -> Tuple[List[int], List[tuple]]:
+    """
+    Split stored uploads into resumes the user already has (returned as ids) and
+    new files to parse. The copies of duplicates are deleted right away.
+    """
+    existing = find_resumes_by_hash(db, user_id, [stored.sha256 for _, stored in saved_files])
+    reused_ids, new_files, seen = [], [], set()
+    for file, stored in saved_files:
+        if stored.sha256 in existing:
+            os.remove(stored.path)
+            reused_ids.append(existing[stored.sha256])
+            logger.info(f"  ♻️  {file.filename} matches resume {existing[stored.sha256]}, reusing it")
+        elif stored.sha256 in seen:
+            os.remove(stored.path)
+            logger.info(f"  ♻️  {file.filename} is repeated in this upload, keeping one copy")
+        else:
+            seen.add(stored.sha256)
+            new_files.append((file, stored))
+    return list(dict.fromkeys(reused_ids)), new_files
+
+
 def get_or_create_demo_user(db: Session):
     """Helper to get or create the demo user"""
     demo_user = db.query(User).filter(User.email == "demo@example.com").first()
@@ -463,7 +851,9 @@ def get_resumes(
     query = db.query(Resume).filter(Resume.user_id == current_user.id)
     
     if job_id:
-        query = query.filter(Resume.job_id == job_id)
+        # Re-uploaded resumes are linked to later jobs through resume_jobs
+        linked = db.query(ResumeJob.resume_id).filter(ResumeJob.job_id == job_id)
+        query = query.filter((Resume.job_id == job_id) | Resume.id.in_(linked))
     
     # Order by created_at descending (most recent first)
     resumes = query.order_by(Resume.created_at.desc()).offset(skip).limit(limit).all()
@@ -560,9 +950,30 @@ def download_resume(
     )
 
 
+def delete_resume_records(db: Session, resumes: List[Resume], background_tasks: BackgroundTasks):
+    """Delete resume rows, their files and their vectors, then schedule compaction"""
+    resume_ids = [resume.id for resume in resumes]
+    
+    for resume in resumes:
+        if os.path.exists(resume.file_path):
+            os.remove(resume.file_path)
+    
+    # Delete associated matches, file hashes and job links first
+    db.query(Match).filter(Match.resume_id.in_(resume_ids)).delete(synchronize_session=False)
+    forget_resumes(db, resume_ids)
+    for resume in resumes:
+        db.delete(resume)
+    db.commit()
+    
+    # Drop the vectors so deleted resumes stop consuming the search budget
+    touched_shards = rag_service.delete_resumes(resume_ids)
+    background_tasks.add_task(rag_service.compact_vector_store, touched_shards)
+
+
 @router.delete("/{resume_id}")
 def delete_resume(
     resume_id: int,
+    background_tasks: BackgroundTasks,
     current_user: Optional[User] = Depends(get_optional_current_user),
     db: Session = Depends(get_db)
 ):
@@ -588,17 +999,50 @@ def delete_resume(
             detail="Resume not found"
         )
     
-    # Delete file
-    if os.path.exists(resume.file_path):
-        os.remove(resume.file_path)
-    
-    # Delete database record
-    db.delete(resume)
-    db.commit()
+    delete_resume_records(db, [resume], background_tasks)
     
     return {"message": "Resume deleted successfully"}
 
 
+@router.post("/bulk-delete")
+def bulk_delete_resumes(
+    request: BulkDeleteRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete many resumes (rows, files and vectors) in one operation"""
+    
+    # Handle authentication (demo mode support)
+    if not current_user:
+        if not settings.ENABLE_DEMO_MODE:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication required"
+            )
+        current_user = get_or_create_demo_user(db)
+
+    resumes = db.query(Resume).filter(
+        Resume.id.in_(request.resume_ids),
+        Resume.user_id == current_user.id
+    ).all()
+    
+    if not resumes:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No matching resumes found"
+        )
+    
+    found_ids = {resume.id for resume in resumes}
+    delete_resume_records(db, resumes, background_tasks)
+    
+    return {
+        "message": f"Deleted {len(found_ids)} resumes",
+        "deleted_ids": sorted(found_ids),
+        "not_found_ids": [rid for rid in request.resume_ids if rid not in found_ids]
+    }
+
+
 @router.get("/{resume_id}/matches", response_model=List[MatchResponse])
 def get_resume_matches(
     resume_id: int,
@@ -160,6 +160,10 @@ class ResumeResponse(ResumeBase):
         from_attributes = True
 
 
+class BulkDeleteRequest(BaseModel):
+    resume_ids: List[int] = Field(..., min_length=1)
+
+
 # Match Schemas
 class MatchResponse(BaseModel):
     id: int
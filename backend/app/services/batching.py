@@ -0,0 +1,128 @@
+"""
+Micro-batching for model calls.
+
+Callers on different threads submit small lists of inputs; a worker thread
+collects everything that arrives within a short window (or until max_batch
+items are queued), runs one forward pass over the lot and hands each caller
+back its own slice of the results, in order.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesces concurrent fn(items) calls into batched calls"""
+
+    def __init__(self, name: str, fn: Callable[[List[Any]], Sequence[Any]], max_batch: int = 64, window_ms: float = 5.0):
+        self.name = name
+        self.fn = fn
+        self.max_batch = max(1, max_batch)
+        self.window = max(0.0, window_ms) / 1000
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+        self._queue: "deque[tuple]" = deque()
+        self._queued_items = 0
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self._worker.start()
+
+    def submit(self, items: List[Any]) -> List[Any]:
+        """Block until the results for items are ready (same order as items)"""
+        if not items:
+            return []
+        future: Future = Future()
+        with self._cond:
+            self._queue.append((list(items), future))
+            self._queued_items += len(items)
+            self._cond.notify()
+        return future.result()
+
+    def _take(self) -> List[tuple]:
+        """Wait for work, then gather requests until the window closes or the batch is full"""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = time.monotonic() + self.window
+            while self._queued_items < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            taken, count = [], 0
+            # Always take at least one request, even if it alone exceeds max_batch
+            while self._queue and (not taken or count + len(self._queue[0][0]) <= self.max_batch):
+                items, future = self._queue.popleft()
+                taken.append((items, future))
+                count += len(items)
+            self._queued_items -= count
+            return taken
+
+    def _run(self):
+        while True:
+            taken = self._take()
+            flat = [item for items, _ in taken for item in items]
+            try:
+                results = list(self.fn(flat))
+            except Exception as e:
+                for _, future in taken:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(flat)
+            self.requests += len(taken)
+            start = 0
+            for items, future in taken:
+                future.set_result(results[start:start + len(items)])
+                start += len(items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "items": self.items,
+            "avg_batch_items": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "queued_items": self._queued_items
+        }
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Wraps a LangChain embeddings object so concurrent embed calls share forward
+    passes. Sits under the embedding cache, so only cache misses are batched.
+    """
+
+    def __init__(self, base, max_batch: int = 64, window_ms: float = 5.0):
+        self.base = base
+        self.documents = MicroBatcher("embed_documents", base.embed_documents, max_batch, window_ms)
+        if getattr(base, "query_encode_kwargs", None):
+            # Queries are encoded differently; batch them through embed_query one by one
+            query_fn = lambda texts: [base.embed_query(text) for text in texts]
+        else:
+            query_fn = base.embed_documents
+        self.queries = MicroBatcher("embed_query", query_fn, max_batch, window_ms)
+
+    def __getattr__(self, name):
+        # Expose the wrapped model's attributes (e.g. model_name)
+        if name in ("base", "documents", "queries"):
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.documents.submit(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.queries.submit([text])[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"embed_documents": self.documents.stats(), "embed_query": self.queries.stats()}
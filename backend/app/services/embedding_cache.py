@@ -0,0 +1,207 @@
+"""
+Content-addressed embedding cache.
+
+Vectors are stored as float32 blobs in SQLite, keyed by (model name, kind,
+sha256 of whitespace-normalized text), so re-uploading a resume or re-embedding
+the same chunk skips the model forward pass entirely.
+"""
+import os
+import re
+import hashlib
+import logging
+import sqlite3
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_SQL_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    """sha256 of the text with whitespace collapsed"""
+    normalized = _WHITESPACE.sub(" ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed (model, kind, text hash) -> vector store with hit/miss counters"""
+
+    def __init__(self, path: str, model_name: str):
+        self.path = path
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, kind, text_hash)
+            )"""
+        )
+        self._conn.commit()
+
+    def get_many(self, hashes: List[str], kind: str = "document") -> Dict[str, List[float]]:
+        """Return cached vectors for the given hashes (missing ones are absent)"""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _SQL_BATCH):
+                batch = unique[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND kind = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, kind, *batch]
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            hit_count = sum(1 for h in hashes if h in found)
+            self.hits += hit_count
+            self.misses += len(hashes) - hit_count
+        return found
+
+    def put_many(self, hashes: List[str], vectors: List[List[float]], kind: str = "document"):
+        rows = [
+            (self.model_name, kind, key, np.asarray(vector, dtype=np.float32).tobytes())
+            for key, vector in zip(hashes, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, kind, text_hash, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ?", [self.model_name]
+            ).fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": size
+            }
+
+
+class TTLLRUCache:
+    """Small in-process LRU cache whose entries also expire after ttl_seconds"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": len(self._entries)
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps a LangChain embeddings object so every embed call checks the cache first.
+    Only cache misses are sent to the underlying model, in one batch.
+    """
+
+    def __init__(self, base, cache: EmbeddingCache):
+        self.base = base
+        self.cache = cache
+
+    def __getattr__(self, name):
+        # Expose the wrapped model's attributes (e.g. model_name)
+        if name in ("base", "cache"):
+            raise AttributeError(name)
+        return getattr(self.base, name)
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        hashes = [text_hash(t) for t in texts]
+        try:
+            cached = self.cache.get_many(hashes, kind=kind)
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding cache lookup failed: {str(e)}")
+            cached = {}
+
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            if kind == "query":
+                fresh = [self.base.embed_query(text) for text in missing.values()]
+            else:
+                fresh = self.base.embed_documents(list(missing.values()))
+            cached.update(zip(missing.keys(), fresh))
+            try:
+                self.cache.put_many(list(missing.keys()), fresh, kind=kind)
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding cache write failed: {str(e)}")
+
+        return [cached[key] for key in hashes]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts, kind="document")
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], kind="query")[0]
+
+
+def wrap_with_cache(base, path: Optional[str], model_name: str):
+    """Wrap embeddings with a persistent cache, or return them unchanged if disabled"""
+    if not path:
+        return base
+    try:
+        return CachedEmbeddings(base, EmbeddingCache(path, model_name))
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to open embedding cache at {path}: {str(e)}. Caching disabled.")
+        return base
@@ -0,0 +1,128 @@
+"""
+Process-pool ingestion for uploaded resumes.
+
+PDF text extraction, OCR and field extraction are CPU-bound and hold the GIL,
+so a batch upload parses its files across INGEST_WORKERS processes instead of
+one after another. Scanned PDFs additionally OCR their pages OCR_WORKERS at a
+time inside each worker, so the CPU ceiling is roughly INGEST_WORKERS *
+OCR_WORKERS tesseract processes.
+
+Results come back in upload order; a file that fails to parse yields its
+exception in place of the parsed dict so callers decide what to skip.
+"""
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Union
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ParseResult = Union[Dict[str, Any], Exception]
+
+
+def _parse_in_worker(file_path: str, file_hash: Optional[str] = None) -> Dict[str, Any]:
+    # Runs in the child process; parsing never touches the models, so importing
+    # the service here only compiles the extraction regexes
+    from app.services.rag_service import rag_service
+    return rag_service.parse_resume(file_path, file_hash)
+
+
+class IngestionPool:
+    """Parses resume PDFs on a lazily started process pool"""
+
+    def __init__(self, workers: int):
+        self.workers = max(0, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.files = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that already holds model threads is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"🏭 Ingestion pool started with {self.workers} processes")
+            return self._pool
+
+    def _reset(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _parse_local(self, file_paths: List[str], file_hashes: List[Optional[str]]) -> List[ParseResult]:
+        from app.services.rag_service import rag_service
+        results: List[ParseResult] = []
+        for path, file_hash in zip(file_paths, file_hashes):
+            try:
+                results.append(rag_service.parse_resume(path, file_hash))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def parse_many(self, file_paths: List[str], file_hashes: Optional[List[Optional[str]]] = None) -> List[ParseResult]:
+        """
+        Parse every file in parallel; results (or exceptions) in the order of file_paths.
+        file_hashes are the files' sha256 digests when the caller already has them.
+        """
+        if not file_paths:
+            return []
+        if file_hashes is None:
+            file_hashes = [None] * len(file_paths)
+        start = time.perf_counter()
+        if self.workers == 0 or len(file_paths) == 1:
+            # A single file isn't worth the pickling round trip
+            results = self._parse_local(file_paths, file_hashes)
+        else:
+            try:
+                executor = self._executor()
+                futures = [
+                    executor.submit(_parse_in_worker, path, file_hash)
+                    for path, file_hash in zip(file_paths, file_hashes)
+                ]
+                results = []
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        results.append(e)
+            except BrokenProcessPool as e:
+                logger.error(f"❌ Ingestion pool crashed ({str(e)}), parsing in-process instead")
+                self._reset()
+                results = self._parse_local(file_paths, file_hashes)
+
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self.files += len(file_paths)
+            self.failed += sum(1 for result in results if isinstance(result, Exception))
+            self.total_seconds += seconds
+        logger.info(f"📚 Parsed {len(file_paths)} PDFs in {seconds:.2f}s")
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "started": self._pool is not None,
+                "files": self.files,
+                "failed": self.failed,
+                "avg_file_ms": round(self.total_seconds / self.files * 1000, 1) if self.files else 0.0
+            }
+
+    def shutdown(self):
+        self._reset()
+
+
+ingestion_pool = IngestionPool(settings.INGEST_WORKERS)
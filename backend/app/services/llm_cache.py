@@ -0,0 +1,114 @@
+"""
+Persistent cache for LLM-generated text.
+
+Selection summaries and match explanations are stored in the llm_outputs table,
+keyed by (LLM model, prompt template version, job hash, resume hash, rank bucket),
+so re-running a ranking for an unchanged job and resume never reaches the pipeline.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from app.models import LLMOutput
+
+logger = logging.getLogger(__name__)
+
+# (template version, job hash, resume hash, rank bucket)
+CacheKey = Tuple[str, str, str, str]
+
+_SQL_BATCH = 400
+
+
+def rank_bucket(rank: int) -> str:
+    """Coarse rank band, so a candidate moving from #4 to #5 keeps its text"""
+    if rank <= 3:
+        return "top3"
+    if rank <= 10:
+        return "top10"
+    return "rest"
+
+
+def score_bucket(score: float) -> str:
+    """Score rounded to one decimal, for prompts that quote the score"""
+    return f"score:{score:.1f}"
+
+
+class LLMOutputCache:
+    """DB-backed store of generated text with hit/miss counters"""
+
+    def __init__(self, session_factory: Callable, model_name: str):
+        self.session_factory = session_factory
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[CacheKey]) -> Dict[CacheKey, str]:
+        """Return cached text for the given keys (missing ones are absent)"""
+        found: Dict[CacheKey, str] = {}
+        by_template: Dict[Tuple[str, str], List[CacheKey]] = {}
+        for key in dict.fromkeys(keys):
+            by_template.setdefault((key[0], key[1]), []).append(key)
+
+        db = self.session_factory()
+        try:
+            for (template_version, job_hash), group in by_template.items():
+                resume_hashes = list({key[2] for key in group})
+                for start in range(0, len(resume_hashes), _SQL_BATCH):
+                    rows = db.query(LLMOutput).filter(
+                        LLMOutput.model == self.model_name,
+                        LLMOutput.template_version == template_version,
+                        LLMOutput.job_hash == job_hash,
+                        LLMOutput.resume_hash.in_(resume_hashes[start:start + _SQL_BATCH])
+                    ).all()
+                    for row in rows:
+                        found[(row.template_version, row.job_hash, row.resume_hash, row.rank_bucket)] = row.text
+        finally:
+            db.close()
+
+        found = {key: found[key] for key in keys if key in found}
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def _row(self, key: CacheKey, text: str) -> LLMOutput:
+        template_version, job_hash, resume_hash, bucket = key
+        return LLMOutput(
+            model=self.model_name,
+            template_version=template_version,
+            job_hash=job_hash,
+            resume_hash=resume_hash,
+            rank_bucket=bucket,
+            text=text
+        )
+
+    def put_many(self, keys: List[CacheKey], texts: List[str]):
+        entries = dict(zip(keys, texts))
+        db = self.session_factory()
+        try:
+            db.add_all([self._row(key, text) for key, text in entries.items()])
+            try:
+                db.commit()
+            except IntegrityError:
+                # A concurrent request stored some of these first; insert the rest one by one
+                db.rollback()
+                for key, text in entries.items():
+                    db.add(self._row(key, text))
+                    try:
+                        db.commit()
+                    except IntegrityError:
+                        db.rollback()
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
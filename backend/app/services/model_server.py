@@ -0,0 +1,318 @@
+"""
+Optional model server.
+
+One local process hosts the embeddings, reranker, summarizer and LLM and serves
+them over a Unix socket, so every uvicorn worker shares a single copy of the
+models. Workers set MODEL_SERVER_SOCKET and RAGService swaps its models for the
+thin Remote* proxies below (the embedding and rerank score caches stay
+client-side, so cache hits never cross the socket).
+
+Concurrent embed/rerank requests from all workers are coalesced into shared
+forward passes by the server-side RAGService's micro-batchers.
+
+Protocol: each frame is a 4-byte big-endian length followed by UTF-8 JSON.
+Requests are {"op": ..., **args}; responses are {"result": ...} or {"error": ...}.
+`generate_stream` answers with {"token": ...} frames followed by {"done": true}.
+
+Run (from backend/):
+    python -m app.services.model_server
+"""
+import os
+import json
+import socket
+import struct
+import logging
+import threading
+import socketserver
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.config import settings
+from app.services.embedding_cache import CachedEmbeddings
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]):
+    payload = json.dumps(message, default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o)).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def _recv(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exact(sock, _HEADER.unpack(header)[0])
+    if payload is None:
+        return None
+    return json.loads(payload.decode("utf-8"))
+
+
+class ModelServerError(RuntimeError):
+    """Raised on the client when the model server reports a failure"""
+
+
+class ModelServerClient:
+    """Blocking client with one persistent connection per calling thread"""
+
+    def __init__(self, socket_path: str, timeout: float = 600.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def call(self, op: str, **args) -> Any:
+        try:
+            sock = self._connection()
+            _send(sock, {"op": op, **args})
+            response = _recv(sock)
+        except OSError:
+            self._reset()
+            raise
+        if response is None:
+            self._reset()
+            raise ModelServerError("Model server closed the connection")
+        if "error" in response:
+            raise ModelServerError(response["error"])
+        return response["result"]
+
+    def stream(self, op: str, **args) -> Iterator[str]:
+        # Streams get their own connection so an abandoned stream can't desync the pooled one
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+            _send(sock, {"op": op, **args})
+            while True:
+                frame = _recv(sock)
+                if frame is None:
+                    raise ModelServerError("Model server closed the stream")
+                if "error" in frame:
+                    raise ModelServerError(frame["error"])
+                if frame.get("done"):
+                    return
+                yield frame["token"]
+        finally:
+            sock.close()
+
+
+class RemoteEmbeddings(Embeddings):
+    """LangChain embeddings backed by the model server"""
+
+    def __init__(self, client: ModelServerClient, model_name: str):
+        self.client = client
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.client.call("embed_documents", texts=texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.client.call("embed_query", text=text)
+
+
+class RemoteReranker:
+    """CrossEncoder stand-in; length bucketing runs on the server"""
+
+    def __init__(self, client: ModelServerClient):
+        self.client = client
+
+    def predict(self, pairs, **kwargs) -> List[float]:
+        return self.client.call("rerank", pairs=[[query, passage] for query, passage in pairs])
+
+
+class RemoteSummarizer:
+    """Summarization pipeline stand-in"""
+
+    def __init__(self, client: ModelServerClient):
+        self.client = client
+
+    def __call__(self, text: str, **kwargs):
+        return self.client.call("summarize", text=text, kwargs=kwargs)
+
+
+class RemoteLLM:
+    """Text-generation pipeline stand-in (JSON-serializable generate kwargs only)"""
+
+    tokenizer = None
+
+    def __init__(self, client: ModelServerClient):
+        self.client = client
+
+    def __call__(self, inputs, **kwargs):
+        return self.client.call("generate", inputs=inputs, kwargs=kwargs)
+
+    def stream(self, inputs, cancelled: Optional[threading.Event] = None, **kwargs) -> Iterator[str]:
+        for token in self.client.stream("generate_stream", inputs=inputs, kwargs=kwargs):
+            if cancelled is not None and cancelled.is_set():
+                # Dropping the connection makes the server stop generating
+                return
+            yield token
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server: "ModelServer" = self.server.model_server
+        while True:
+            try:
+                request = _recv(self.request)
+            except (OSError, ValueError):
+                return
+            if request is None:
+                return
+            op = request.pop("op", None)
+            try:
+                if op == "generate_stream":
+                    tokens = server.generate_stream(request["inputs"], **request.get("kwargs", {}))
+                    try:
+                        for token in tokens:
+                            _send(self.request, {"token": token})
+                    finally:
+                        # Stops generation if the client went away mid-stream
+                        tokens.close()
+                    _send(self.request, {"done": True})
+                else:
+                    _send(self.request, {"result": server.dispatch(op, request)})
+            except (BrokenPipeError, ConnectionResetError):
+                return
+            except Exception as e:
+                logger.error(f"❌ Model server op '{op}' failed: {str(e)}")
+                try:
+                    _send(self.request, {"error": f"{type(e).__name__}: {str(e)}"})
+                except OSError:
+                    return
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class ModelServer:
+    """Hosts a local RAGService's models and serves them over a Unix socket"""
+
+    def __init__(self, socket_path: str, rag_service):
+        self.socket_path = socket_path
+        self.rag_service = rag_service
+
+    @property
+    def _base_embeddings(self):
+        # Caching happens on the clients; the server skips its own cache but keeps micro-batching
+        embeddings = self.rag_service.embeddings
+        return embeddings.base if isinstance(embeddings, CachedEmbeddings) else embeddings
+
+    def dispatch(self, op: str, request: Dict[str, Any]) -> Any:
+        # Embed and rerank go through RAGService's micro-batchers, so concurrent
+        # requests from all workers share forward passes
+        if op == "embed_documents":
+            return self._base_embeddings.embed_documents(request["texts"])
+        if op == "embed_query":
+            return self._base_embeddings.embed_query(request["text"])
+        if op == "rerank":
+            if not self.rag_service.reranker_available:
+                raise RuntimeError("Reranker not available")
+            return self.rag_service.score_pairs(request["pairs"])
+        if op == "summarize":
+            if not self.rag_service.summarizer_available:
+                raise RuntimeError("Summarizer not available")
+            return self.rag_service.summarizer(request["text"], **request.get("kwargs", {}))
+        if op == "generate":
+            if not self.rag_service.llm_available:
+                raise RuntimeError("LLM not available")
+            kwargs = request.get("kwargs", {})
+            if isinstance(request["inputs"], list) and "batch_size" in kwargs:
+                self.rag_service._prepare_llm_batching()
+            return self.rag_service.llm(request["inputs"], **kwargs)
+        if op == "available":
+            return self.available(request["model"])
+        if op == "status":
+            return self.status()
+        raise ValueError(f"Unknown op: {op}")
+
+    def generate_stream(self, inputs, **kwargs) -> Iterator[str]:
+        if not self.rag_service.llm_available:
+            raise RuntimeError("LLM not available")
+        return self.rag_service.stream_llm(inputs, **kwargs)
+
+    def available(self, model: str) -> bool:
+        """Load one model (if needed) and report whether it is usable"""
+        if model == "embeddings":
+            return self.rag_service.embeddings is not None
+        if model == "reranker":
+            return self.rag_service.reranker_available
+        if model == "summarizer":
+            return self.rag_service.summarizer_available
+        if model == "llm":
+            return self.rag_service.llm_available
+        raise ValueError(f"Unknown model: {model}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "embeddings": self.rag_service._embeddings is not None,
+            "reranker": self.rag_service.reranker_available,
+            "summarizer": self.rag_service.summarizer_available,
+            "llm": self.rag_service.llm_available,
+            "batching": self.rag_service.batching_stats()
+        }
+
+    def serve_forever(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        server = _UnixServer(self.socket_path, _Handler)
+        server.model_server = self
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"🧠 Model server listening on {self.socket_path}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    socket_path = settings.MODEL_SERVER_SOCKET or "./vector_stores/model_server.sock"
+
+    # This process hosts the models itself
+    settings.MODEL_SERVER_SOCKET = ""
+    from app.services.rag_service import rag_service
+    from app.services.warmup import ModelWarmup
+
+    ModelWarmup(rag_service, settings.WARMUP_MODELS).start()
+    ModelServer(socket_path, rag_service).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
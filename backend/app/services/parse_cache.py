@@ -0,0 +1,130 @@
+"""
+Persistent PDF parse artifacts.
+
+One gzip-compressed JSON file per PDF content hash holds the parsed page
+documents, the full text, whether OCR was needed, and the chunks produced by
+each splitter configuration (keyed by splitter name, chunk size and overlap).
+process_pdf reads it before touching PyPDFLoader or tesseract, so re-indexing
+an unchanged file never parses it again, and changing CHUNK_SIZE/CHUNK_OVERLAP
+only re-splits the cached pages.
+
+Files are written to a temp name and renamed into place, so the ingestion
+worker processes can share the directory safely.
+"""
+import os
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 2
+
+_READ_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def splitter_key(name: str, chunk_size: int, chunk_overlap: int) -> str:
+    return f"{name}:{chunk_size}:{chunk_overlap}"
+
+
+def serialize_documents(documents) -> List[Dict[str, Any]]:
+    return [{"page_content": doc.page_content, "metadata": dict(doc.metadata)} for doc in documents]
+
+
+def deserialize_documents(items: List[Dict[str, Any]], source: Optional[str] = None):
+    """Rebuild LangChain documents; source re-points them at the file being processed"""
+    from langchain_core.documents import Document
+    documents = []
+    for item in items:
+        metadata = dict(item["metadata"])
+        if source is not None:
+            metadata["source"] = source
+        documents.append(Document(page_content=item["page_content"], metadata=metadata))
+    return documents
+
+
+class ParseArtifactCache:
+    """Directory of {sha256}.json.gz parse artifacts with hit/miss counters"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.resplits = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.directory, file_hash[:2], f"{file_hash}.json.gz")
+
+    def get(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Load the artifact for a file hash, or None (missing, stale version or unreadable)"""
+        path = self._path(file_hash)
+        artifact = None
+        if os.path.exists(path):
+            try:
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    artifact = json.load(f)
+                if artifact.get("version") != ARTIFACT_VERSION:
+                    artifact = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Ignoring unreadable parse artifact {path}: {str(e)}")
+                artifact = None
+        with self._lock:
+            if artifact is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return artifact
+
+    def put(self, artifact: Dict[str, Any]):
+        """Atomically write an artifact (overwrites an older one for the same hash)"""
+        path = self._path(artifact["sha256"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                f.write(json.dumps(artifact, default=str).encode("utf-8"))
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def record_resplit(self):
+        with self._lock:
+            self.resplits += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "resplits": self.resplits,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
+
+
+def new_artifact(file_hash: str, pages, ocr_used: bool) -> Dict[str, Any]:
+    return {
+        "version": ARTIFACT_VERSION,
+        "sha256": file_hash,
+        "ocr_used": ocr_used,
+        "text": "\n".join(page.page_content for page in pages),
+        "pages": serialize_documents(pages),
+        "chunks": {}
+    }
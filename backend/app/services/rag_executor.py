@@ -0,0 +1,133 @@
+"""
+Bounded execution layer for blocking RAG work.
+
+Async endpoints await `rag_executor.run(stage, fn, ...)` instead of calling PDF
+parsing, embedding, reranking or LLM generation directly, so the event loop
+keeps serving other requests (including /health). Work runs on a dedicated
+thread pool and each stage has its own concurrency limit; callers over the limit
+wait in that stage's queue. Queue depth and wait times are exposed via stats().
+"""
+import time
+import asyncio
+import logging
+import threading
+import functools
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Stage:
+    """Concurrency limit and counters for one pipeline stage"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.semaphore = asyncio.Semaphore(self.limit)
+        self.waiting = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        done = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait / done * 1000, 1) if done else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "avg_run_ms": round(self.total_run / done * 1000, 1) if done else 0.0
+        }
+
+
+class RAGExecutor:
+    """Thread pool plus per-stage concurrency limits for CPU-bound RAG calls"""
+
+    def __init__(self, max_workers: int, stage_limits: Dict[str, int]):
+        self.max_workers = max(1, max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rag")
+        self._stages = {name: _Stage(name, limit) for name, limit in stage_limits.items()}
+        self._lock = threading.Lock()
+
+    def _stage(self, name: str) -> _Stage:
+        with self._lock:
+            if name not in self._stages:
+                logger.warning(f"⚠️ Unknown RAG stage '{name}', limiting to 1 concurrent call")
+                self._stages[name] = _Stage(name, 1)
+            return self._stages[name]
+
+    async def _acquire(self, stage: _Stage) -> float:
+        """Wait for a free slot without blocking the event loop; returns seconds waited"""
+        start = time.perf_counter()
+        with self._lock:
+            stage.waiting += 1
+        try:
+            await stage.semaphore.acquire()
+        finally:
+            with self._lock:
+                stage.waiting -= 1
+        waited = time.perf_counter() - start
+        with self._lock:
+            stage.active += 1
+            stage.total_wait += waited
+            stage.max_wait = max(stage.max_wait, waited)
+        return waited
+
+    def _release(self, stage: _Stage, ran: float, ok: bool):
+        with self._lock:
+            stage.active -= 1
+            stage.total_run += ran
+            if ok:
+                stage.completed += 1
+            else:
+                stage.failed += 1
+        stage.semaphore.release()
+
+    async def run(self, stage_name: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool once the stage has a free slot"""
+        stage = self._stage(stage_name)
+        waited = await self._acquire(stage)
+        if waited > 1:
+            logger.info(f"⏳ RAG stage '{stage_name}' waited {waited:.1f}s for a slot")
+        start = time.perf_counter()
+        ok = False
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+            ok = True
+            return result
+        finally:
+            self._release(stage, time.perf_counter() - start, ok)
+
+    @asynccontextmanager
+    async def slot(self, stage_name: str):
+        """Hold a stage slot for work that manages its own thread (e.g. streaming generation)"""
+        stage = self._stage(stage_name)
+        await self._acquire(stage)
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self._release(stage, time.perf_counter() - start, ok)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "stages": {name: stage.stats() for name, stage in self._stages.items()}
+            }
+
+
+rag_executor = RAGExecutor(settings.RAG_EXECUTOR_WORKERS, settings.RAG_STAGE_LIMITS)
@@ -1,15 +1,86 @@
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
 import re
 import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pytesseract
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 
 from app.config import settings
+from app.services.vector_shards import ShardManager
+from app.services.embedding_cache import wrap_with_cache, text_hash, TTLLRUCache
+from app.services.rerank_cache import PairScoreCache
+from app.services.skill_extractor import SkillExtractor, DEFAULT_TAXONOMY_PATH
+from app.services.parse_cache import (
+    ParseArtifactCache, file_sha256, splitter_key, new_artifact,
+    serialize_documents, deserialize_documents
+)
+from app.services.rerank_engine import RerankEngine, aggregate_passage_scores
+from app.services.batching import MicroBatcher, BatchedEmbeddings
+from app.services.llm_cache import LLMOutputCache, rank_bucket, score_bucket
+from app.services.model_server import (
+    ModelServerClient, RemoteEmbeddings, RemoteReranker, RemoteSummarizer, RemoteLLM
+)
 
 logger = logging.getLogger(__name__)
 
+# Bump when a prompt template changes so cached LLM outputs are regenerated
+SELECTION_SUMMARY_PROMPT_VERSION = "selection-summary-v1"
+EXPLANATION_PROMPT_VERSION = "match-explanation-v1"
+
+
+_hf_token_lock = threading.Lock()
+_hf_token_users = 0
+_hf_saved_token: Optional[str] = None
+
+
+@contextmanager
+def anonymous_hf_access():
+    """
+    Unset HUGGINGFACEHUB_API_TOKEN while public models load. Reference-counted so
+    models loading in parallel threads don't restore the token under each other.
+    """
+    global _hf_token_users, _hf_saved_token
+    with _hf_token_lock:
+        if _hf_token_users == 0:
+            _hf_saved_token = os.environ.pop("HUGGINGFACEHUB_API_TOKEN", None)
+        _hf_token_users += 1
+    try:
+        yield
+    finally:
+        with _hf_token_lock:
+            _hf_token_users -= 1
+            if _hf_token_users == 0 and _hf_saved_token:
+                os.environ["HUGGINGFACEHUB_API_TOKEN"] = _hf_saved_token
+
+
+def build_job_query(job) -> str:
+    """The job text used as the retrieval/rerank query (title + description + requirements)"""
+    requirements_text = "\n".join(job.requirements) if job.requirements else ""
+    return f"{job.title}\n{job.description}\nRequirements:\n{requirements_text}"
+
+
+def explanation_inputs(ranked_results: List[Dict]) -> List[Dict[str, Any]]:
+    """generate_explanations() inputs for match_resumes_to_job() results"""
+    return [
+        {'skills': r["skills"], 'rerank_score': r.get("rerank_score", r["embedding_score"])}
+        for r in ranked_results
+    ]
+
+
+def ocr_page(file_path: str, page_number: int, dpi: int) -> str:
+    """Rasterize one PDF page (1-based) in grayscale and OCR it; the image is released before returning"""
+    images = convert_from_path(file_path, dpi=dpi, first_page=page_number, last_page=page_number, grayscale=True)
+    try:
+        return "\n".join(pytesseract.image_to_string(image) for image in images)
+    finally:
+        for image in images:
+            image.close()
+
+
 class RAGService:
     """Service for RAG operations aligned with Demo Notebook pipeline"""
     
@@ -18,32 +89,62 @@ class RAGService:
         self._embeddings = None
         self._reranker = None
         self._summarizer = None
-        self._vector_store = None
+        
+        # Optional shared model server; when set, models below are thin remote proxies
+        self.model_client = ModelServerClient(settings.MODEL_SERVER_SOCKET) if settings.MODEL_SERVER_SOCKET else None
+        
+        # One lock per model so warm-up threads and early requests load each model once
+        self._load_locks = {name: threading.Lock() for name in ("embeddings", "reranker", "summarizer", "llm")}
+        
+        # One FAISS shard per user, persisted under VECTOR_STORE_DIR and loaded lazily
+        self.shards = ShardManager(
+            base_dir=settings.VECTOR_STORE_DIR,
+            embeddings_provider=lambda: self.embeddings,
+            max_memory_mb=settings.VECTOR_SHARD_MEMORY_MB
+        )
+        
+        self._rerank_cache = None
+        self._rerank_engine = None
+        self._rerank_batcher = None
+        self._llm_output_cache = None
+        self._parse_cache = None
+        
+        # Hot query embeddings (job descriptions re-embedded on every dashboard load)
+        self._query_cache = TTLLRUCache(
+            max_entries=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        )
         
         # Lazy load LLM
         self._llm = None
         self._llm_available = False
         self._llm_tried_loading = False
         
-        # Pre-compile regex for skills
-        self._skill_patterns = self._compile_skill_patterns()
+        # Skill taxonomy compiled into a single-pass matcher
+        self._skill_extractor = SkillExtractor.from_file(settings.SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH)
         
     @property
     def embeddings(self):
         if not self._embeddings:
-            self._embeddings = self._setup_embeddings()
+            with self._load_locks["embeddings"]:
+                if not self._embeddings:
+                    self._embeddings = self._setup_embeddings()
         return self._embeddings
 
     @property
     def reranker(self):
         if not self._reranker:
-            self._reranker = self._setup_reranker()
+            with self._load_locks["reranker"]:
+                if not self._reranker:
+                    self._reranker = self._setup_reranker()
         return self._reranker
         
     @property
     def summarizer(self):
         if not self._summarizer:
-            self._summarizer = self._setup_summarizer()
+            with self._load_locks["summarizer"]:
+                if not self._summarizer:
+                    self._summarizer = self._setup_summarizer()
         return self._summarizer
 
     @property
@@ -54,20 +155,15 @@ class RAGService:
     def summarizer_available(self):
         return self.summarizer is not None
 
-    @property
-    def vector_store(self):
-        return self._vector_store
-        
-    @vector_store.setter
-    def vector_store(self, value):
-        self._vector_store = value
-
     @property
     def llm(self):
         """Lazy load LLM on first access"""
         if not self._llm_tried_loading:
-            self._llm = self._setup_llm()
-            self._llm_tried_loading = True
+            with self._load_locks["llm"]:
+                if not self._llm_tried_loading:
+                    self._llm = self._setup_llm()
+                    # A local load failure is final; a model server may come back, so probe again next time
+                    self._llm_tried_loading = self._llm is not None or not self.model_client
         return self._llm
         
     @property
@@ -77,8 +173,20 @@ class RAGService:
             self.llm # Trigger load
         return self._llm_available
 
+    def _remote_available(self, model: str) -> bool:
+        """Ask the model server; a negative answer is not cached, callers probe again on next use"""
+        try:
+            return bool(self.model_client.call("available", model=model))
+        except Exception as e:
+            logger.warning(f"⚠️ Model server unreachable at {settings.MODEL_SERVER_SOCKET}: {str(e)}")
+            return False
+
     def _setup_embeddings(self):
         """Setup HuggingFace embeddings (all-mpnet-base-v2)"""
+        if self.model_client:
+            logger.info(f"🔌 Using embeddings from model server: {settings.EMBEDDING_MODEL}")
+            remote = RemoteEmbeddings(self.model_client, settings.EMBEDDING_MODEL)
+            return wrap_with_cache(remote, settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_MODEL)
         try:
             from langchain_huggingface import HuggingFaceEmbeddings
             logger.info(f"🔧 Setting up embeddings: {settings.EMBEDDING_MODEL}...")
@@ -88,13 +196,126 @@ class RAGService:
                 encode_kwargs={'normalize_embeddings': True}
             )
             logger.info("✅ Embeddings setup complete")
-            return embeddings
+            if settings.MICRO_BATCH_ENABLED:
+                embeddings = BatchedEmbeddings(embeddings, settings.MICRO_BATCH_MAX_ITEMS, settings.MICRO_BATCH_WINDOW_MS)
+            return wrap_with_cache(embeddings, settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_MODEL)
         except Exception as e:
             logger.error(f"❌ Failed to setup embeddings: {str(e)}")
             raise
 
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the model caches"""
+        stats = {"query_embeddings": self._query_cache.stats()}
+        cache = getattr(self._embeddings, "cache", None) if self._embeddings else None
+        if cache is not None:
+            stats["embeddings"] = cache.stats()
+        if self._rerank_cache is not None:
+            stats["rerank_scores"] = self._rerank_cache.stats()
+        if self._llm_output_cache is not None:
+            stats["llm_outputs"] = self._llm_output_cache.stats()
+        if self._parse_cache is not None:
+            # Counts parses done in this process; ingestion workers keep their own
+            stats["parse_artifacts"] = self._parse_cache.stats()
+        return stats
+    
+    @property
+    def llm_output_cache(self) -> Optional[LLMOutputCache]:
+        if self._llm_output_cache is None and settings.LLM_OUTPUT_CACHE_ENABLED:
+            from app.database import SessionLocal
+            self._llm_output_cache = LLMOutputCache(SessionLocal, settings.LLM_REPO_ID)
+        return self._llm_output_cache
+    
+    def _cached_llm_outputs(self, keys: List[Tuple[str, str, str, str]]) -> Dict[Tuple[str, str, str, str], str]:
+        if self.llm_output_cache is None or not keys:
+            return {}
+        try:
+            return self.llm_output_cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"⚠️ LLM output cache lookup failed: {str(e)}")
+            return {}
+    
+    def _store_llm_outputs(self, keys: List[Tuple[str, str, str, str]], texts: List[str]):
+        if self.llm_output_cache is None or not keys:
+            return
+        try:
+            self.llm_output_cache.put_many(keys, texts)
+        except Exception as e:
+            logger.warning(f"⚠️ LLM output cache write failed: {str(e)}")
+    
+    @property
+    def parse_cache(self) -> Optional[ParseArtifactCache]:
+        if self._parse_cache is None and settings.PARSE_CACHE_DIR:
+            try:
+                self._parse_cache = ParseArtifactCache(settings.PARSE_CACHE_DIR)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to open parse cache: {str(e)}. Parse caching disabled.")
+        return self._parse_cache
+    
+    @property
+    def rerank_cache(self) -> Optional[PairScoreCache]:
+        if self._rerank_cache is None and settings.RERANK_CACHE_PATH:
+            try:
+                self._rerank_cache = PairScoreCache(
+                    settings.RERANK_CACHE_PATH, settings.RERANKER_MODEL, settings.RERANK_MAX_TOKENS
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to open rerank cache: {str(e)}. Score caching disabled.")
+        return self._rerank_cache
+    
+    @property
+    def rerank_engine(self) -> Optional[RerankEngine]:
+        if self._rerank_engine is None and self.reranker is not None:
+            self._rerank_engine = RerankEngine(
+                self.reranker,
+                batch_size=settings.RERANK_BATCH_SIZE,
+                max_tokens=settings.RERANK_MAX_TOKENS,
+                tokens_per_batch=settings.RERANK_TOKENS_PER_BATCH
+            )
+        return self._rerank_engine
+    
+    def score_pairs(self, pairs: List[List[str]]) -> List[float]:
+        """
+        Uncached CrossEncoder scores. Concurrent callers are coalesced by the rerank
+        micro-batcher, and the combined set is length-bucketed by the rerank engine.
+        """
+        if not settings.MICRO_BATCH_ENABLED:
+            return self.rerank_engine.predict(pairs)
+        if self._rerank_batcher is None:
+            with self._load_locks["reranker"]:
+                if self._rerank_batcher is None:
+                    self._rerank_batcher = MicroBatcher(
+                        "rerank", self.rerank_engine.predict,
+                        settings.MICRO_BATCH_MAX_ITEMS, settings.MICRO_BATCH_WINDOW_MS
+                    )
+        return self._rerank_batcher.submit(pairs)
+    
+    def batching_stats(self) -> Dict[str, Any]:
+        """Forward passes vs. requests for the embed/rerank micro-batchers"""
+        stats = {}
+        # BatchedEmbeddings sits directly under the embedding cache (or is the top layer without one)
+        for layer in (self._embeddings, getattr(self._embeddings, "base", None)):
+            if isinstance(layer, BatchedEmbeddings):
+                stats.update(layer.stats())
+                break
+        if self._rerank_batcher is not None:
+            stats["rerank"] = self._rerank_batcher.stats()
+        return stats
+    
+    def rerank(self, pairs: List[List[str]]) -> List[float]:
+        """CrossEncoder scores for [query, passage] pairs, in input order; cached pairs skip the model"""
+        if not pairs:
+            return []
+        # Remote reranker runs the length-bucketed engine on the server
+        predict = self.reranker.predict if self.model_client else self.score_pairs
+        if self.rerank_cache is None:
+            return predict(pairs)
+        return self.rerank_cache.score(pairs, predict)
+
     def _setup_llm(self):
         """Setup local LLM using transformers pipeline"""
+        if self.model_client:
+            self._llm_available = self._remote_available("llm")
+            return RemoteLLM(self.model_client) if self._llm_available else None
         try:
             logger.info(f"🔧 Setting up local LLM: {settings.LLM_REPO_ID}...")
             logger.info("⬇️  Downloading/Loading model locally (this may take a while first time)...")
@@ -124,21 +345,16 @@ class RAGService:
 
     def _setup_reranker(self):
         """Setup CrossEncoder for reranking"""
+        if self.model_client:
+            return RemoteReranker(self.model_client) if self._remote_available("reranker") else None
         try:
             from sentence_transformers import CrossEncoder
             logger.info(f"🔧 Setting up reranker: {settings.RERANKER_MODEL}...")
             
             # Temporarily unset invalid HF tokens to allow anonymous access
             # This fixes the 401 error for public models
-            old_token = os.environ.get("HUGGINGFACEHUB_API_TOKEN")
-            if old_token:
-                del os.environ["HUGGINGFACEHUB_API_TOKEN"]
-            
-            reranker = CrossEncoder(settings.RERANKER_MODEL)
-            
-            # Restore token if it existed
-            if old_token:
-                os.environ["HUGGINGFACEHUB_API_TOKEN"] = old_token
+            with anonymous_hf_access():
+                reranker = CrossEncoder(settings.RERANKER_MODEL, max_length=settings.RERANK_MAX_TOKENS)
                 
             logger.info("✅ Reranker setup complete")
             return reranker
@@ -148,28 +364,23 @@ class RAGService:
 
     def _setup_summarizer(self):
         """Setup T5 summarizer"""
+        if self.model_client:
+            return RemoteSummarizer(self.model_client) if self._remote_available("summarizer") else None
         try:
             from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
             logger.info(f"🔧 Setting up summarizer: {settings.SUMMARIZER_MODEL}...")
             
             # Temporarily unset invalid HF tokens to allow anonymous access
-            old_token = os.environ.get("HUGGINGFACEHUB_API_TOKEN")
-            if old_token:
-                del os.environ["HUGGINGFACEHUB_API_TOKEN"]
-            
-            tokenizer = AutoTokenizer.from_pretrained(settings.SUMMARIZER_MODEL, token=False)
-            model = AutoModelForSeq2SeqLM.from_pretrained(settings.SUMMARIZER_MODEL, token=False)
-            summarizer_pipeline = pipeline(
-                "summarization", 
-                model=model, 
-                tokenizer=tokenizer, 
-                framework="pt", 
-                device=-1 # CPU
-            )
-            
-            # Restore token if it existed
-            if old_token:
-                os.environ["HUGGINGFACEHUB_API_TOKEN"] = old_token
+            with anonymous_hf_access():
+                tokenizer = AutoTokenizer.from_pretrained(settings.SUMMARIZER_MODEL, token=False)
+                model = AutoModelForSeq2SeqLM.from_pretrained(settings.SUMMARIZER_MODEL, token=False)
+                summarizer_pipeline = pipeline(
+                    "summarization", 
+                    model=model, 
+                    tokenizer=tokenizer, 
+                    framework="pt", 
+                    device=-1 # CPU
+                )
                 
             logger.info("✅ Summarizer setup complete")
             return summarizer_pipeline
@@ -177,96 +388,231 @@ class RAGService:
             logger.warning(f"⚠️ Failed to setup summarizer: {str(e)}. Summarization will be disabled.")
             return None
     
-    def process_pdf(self, file_path: str) -> List[Any]:
-        """Load and process a PDF file"""
-        from langchain_community.document_loaders import PyPDFLoader
+    def process_pdf(self, file_path: str, file_hash: Optional[str] = None) -> List[Any]:
+        """
+        Load and chunk a PDF. The parse artifact (pages, OCR flag, chunks per
+        splitter configuration) is cached by file hash, so an unchanged file is
+        never parsed twice and a new chunk size only re-splits cached pages.
+        Pass file_hash when the sha256 is already known (uploads hash while
+        streaming to disk) to skip re-reading the file.
+        """
+        cache = self.parse_cache
+        if cache is None:
+            pages, _ = self._load_pdf_pages(file_path)
+            return self._split_pages(pages)
+        
+        file_hash = file_hash or file_sha256(file_path)
+        key = splitter_key("recursive", settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+        artifact = cache.get(file_hash)
+        if artifact is not None and key in artifact["chunks"]:
+            logger.info(f"♻️ Reusing parsed chunks for {os.path.basename(file_path)}")
+            return deserialize_documents(artifact["chunks"][key], source=file_path)
+        
+        if artifact is None:
+            pages, ocr_used = self._load_pdf_pages(file_path)
+            artifact = new_artifact(file_hash, pages, ocr_used)
+        else:
+            # Parsed before with other splitter settings; only re-split
+            pages = deserialize_documents(artifact["pages"], source=file_path)
+            cache.record_resplit()
+        
+        chunks = self._split_pages(pages)
+        artifact["chunks"][key] = serialize_documents(chunks)
+        try:
+            cache.put(artifact)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to store parse artifact: {str(e)}")
+        return chunks
+    
+    def _split_pages(self, pages) -> List[Any]:
         from langchain.text_splitter import RecursiveCharacterTextSplitter
+        
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=settings.CHUNK_SIZE,
+            chunk_overlap=settings.CHUNK_OVERLAP
+        )
+        return text_splitter.split_documents(pages)
+    
+    def _load_pdf_pages(self, file_path: str) -> Tuple[List[Any], bool]:
+        """
+        Extract page documents from a PDF; returns (pages, ocr_used).
+        
+        Pages whose text layer is missing (fewer than OCR_MIN_PAGE_CHARS characters)
+        are rasterized one at a time and OCR'd, so a mixed PDF only pays OCR for
+        its scanned pages.
+        """
+        from langchain_community.document_loaders import PyPDFLoader
         from langchain_core.documents import Document
         
         loader = PyPDFLoader(file_path)
         documents = loader.load()
+        if not documents:
+            # No parsable page objects at all; treat every page as scanned
+            page_count = pdfinfo_from_path(file_path).get("Pages", 0)
+            documents = [Document(page_content="", metadata={"source": file_path, "page": i}) for i in range(page_count)]
+        
+        scanned = [i for i, doc in enumerate(documents) if len(doc.page_content.strip()) < settings.OCR_MIN_PAGE_CHARS]
+        if not scanned:
+            return documents, False
+        
+        workers = max(1, min(settings.OCR_WORKERS, len(scanned)))
+        logger.info(f"⚠️ {len(scanned)}/{len(documents)} pages have no text layer. OCR at {settings.OCR_DPI} DPI ({workers} at a time) for {file_path}...")
         
-        # Check if text extraction was successful (OCR fallback)
-        total_text = "".join([d.page_content for d in documents])
-        if len(total_text.strip()) < 100:
-            logger.info(f"⚠️ PDF text content too short ({len(total_text.strip())} chars). Attempting OCR for {file_path}...")
+        def scan(index: int) -> Optional[str]:
             try:
-                images = convert_from_path(file_path)
-                ocr_text = ""
-                for i, img in enumerate(images):
-                    logger.info(f"  🔍 OCR scanning page {i+1}...")
-                    ocr_text += pytesseract.image_to_string(img) + "\n"
-                
-                if len(ocr_text.strip()) > 100:
-                    documents = [Document(page_content=ocr_text, metadata={"source": file_path})]
-                    logger.info("✅ OCR extraction successful")
-                else:
-                    logger.warning("⚠️ OCR also yielded low text content")
+                return ocr_page(file_path, index + 1, settings.OCR_DPI)
             except Exception as e:
-                logger.error(f"❌ OCR failed: {str(e)}")
-                # Continue with original documents if OCR fails
+                logger.error(f"❌ OCR failed on page {index + 1}: {str(e)}")
+                return None
+        
+        # tesseract runs as a subprocess per page, so threads OCR pages in parallel
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr") as pool:
+            texts = list(pool.map(scan, scanned))
+        
+        ocr_used = False
+        for index, text in zip(scanned, texts):
+            if text and text.strip():
+                documents[index].page_content = text
+                documents[index].metadata["ocr"] = True
+                ocr_used = True
+        if ocr_used:
+            logger.info("✅ OCR extraction successful")
+        else:
+            logger.warning("⚠️ OCR yielded no text")
+        return documents, ocr_used
+    
+    def parse_resume(self, file_path: str, file_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Extract chunks, text and structured fields from a resume PDF.
         
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP
-        )
-        chunks = text_splitter.split_documents(documents)
-        return chunks
+        Returns:
+            Dict with chunks, text, skills, education, experience and contact
+        """
+        chunks = self.process_pdf(file_path, file_hash)
+        text = " ".join([chunk.page_content for chunk in chunks])
+        return {
+            "chunks": chunks,
+            "text": text,
+            "skills": self.extract_skills(text),
+            "education": self.extract_education(text),
+            "experience": self.extract_experience(text),
+            "contact": self.extract_contact_info(text)
+        }
+
+    def _tag_chunks(self, documents, resume_id: int, user_id: Optional[int] = None) -> List[str]:
+        """Stamp resume_id/chunk_index on each chunk and return their docstore ids"""
+        ids = []
+        for idx, doc in enumerate(documents):
+            doc.metadata["resume_id"] = resume_id
+            doc.metadata["chunk_index"] = idx
+            if user_id is not None:
+                doc.metadata["user_id"] = user_id
+            ids.append(f"{resume_id}:{idx}")
+        return ids
     
-    def create_vector_store(self, documents):
-        """Create a FAISS vector store from documents"""
-        from langchain_community.vectorstores import FAISS
-        self.vector_store = FAISS.from_documents(
-            documents=documents,
-            embedding=self.embeddings
-        )
-        return self.vector_store
+    def add_resumes_to_vector_store(self, resume_chunks: List[Tuple[int, List[Any]]], user_id: Optional[int] = None):
+        """
+        Embed every chunk of an upload in one pass and append them in place to the
+        owner's shard, instead of building and merging a throwaway index per file.
+        
+        Args:
+            resume_chunks: List of (resume_id, chunks) pairs
+            user_id: Owner of the resumes (selects the shard)
+        """
+        documents, ids = [], []
+        for resume_id, chunks in resume_chunks:
+            ids.extend(self._tag_chunks(chunks, resume_id, user_id))
+            documents.extend(chunks)
+        if not documents:
+            return None
+        
+        texts = [doc.page_content for doc in documents]
+        logger.info(f"🔢 Embedding {len(texts)} chunks from {len(resume_chunks)} resumes in one batch...")
+        vectors = self.embeddings.embed_documents(texts)
+        return self.shards.add(texts, vectors, [doc.metadata for doc in documents], ids, user_id)
     
-    def add_to_vector_store(self, documents):
-        """Add documents to existing vector store"""
-        from langchain_community.vectorstores import FAISS
-        if self.vector_store is None:
-            return self.create_vector_store(documents)
-        
-        new_store = FAISS.from_documents(
-            documents=documents,
-            embedding=self.embeddings
-        )
-        self.vector_store.merge_from(new_store)
-        return self.vector_store
+    def add_to_vector_store(self, documents, resume_id: int, user_id: Optional[int] = None):
+        """Add a single resume's chunks to its owner's shard"""
+        return self.add_resumes_to_vector_store([(resume_id, documents)], user_id=user_id)
     
-    def save_vector_store(self, path: str):
-        if self.vector_store:
-            self.vector_store.save_local(path)
+    def flush_vector_store(self, user_id: Optional[int] = None):
+        """Persist the user's shard after an ingest"""
+        try:
+            self.shards.flush(user_id)
+        except Exception as e:
+            logger.error(f"❌ Failed to flush vector shard: {str(e)}")
     
-    def load_vector_store(self, path: str):
-        from langchain_community.vectorstores import FAISS
-        self.vector_store = FAISS.load_local(
-            path,
-            self.embeddings,
-            allow_dangerous_deserialization=True
-        )
-        return self.vector_store
+    def delete_resumes(self, resume_ids: Iterable[int]) -> List[str]:
+        """
+        Remove resumes' vectors via the id map. Rows are tombstoned immediately (so
+        they stop being returned) and persisted; compact_vector_store rebuilds the
+        index once enough of it is dead.
+        
+        Returns:
+            Names of the shards that were touched
+        """
+        touched = self.shards.delete_resumes(resume_ids)
+        try:
+            self.shards.flush_shards(touched)
+        except Exception as e:
+            logger.error(f"❌ Failed to flush vector shards after delete: {str(e)}")
+        return touched
+    
+    def compact_vector_store(self, shard_names: Optional[List[str]] = None):
+        """Rebuild shards whose tombstone ratio crossed VECTOR_COMPACTION_THRESHOLD"""
+        try:
+            self.shards.compact(shard_names, min_ratio=settings.VECTOR_COMPACTION_THRESHOLD)
+        except Exception as e:
+            logger.error(f"❌ Vector store compaction failed: {str(e)}")
+    
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, serving repeated job descriptions from the in-process LRU"""
+        key = text_hash(text)
+        vector = self._query_cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._query_cache.put(key, vector)
+        return vector
+    
+    def invalidate_query(self, text: str):
+        """Drop a query's cached embedding (e.g. after its job is edited)"""
+        self._query_cache.invalidate(text_hash(text))
+    
+    def search_resumes(
+        self,
+        query: str,
+        resume_ids: Optional[Iterable[int]] = None,
+        user_id: Optional[int] = None,
+        k: Optional[int] = None
+    ) -> List[Tuple[Any, float]]:
+        """
+        Similarity search restricted to a set of resumes or one user's resumes.
+        
+        Only the owning shards are opened, and within a shard only the rows of the
+        requested resumes are scored (FAISS IDSelectorBatch), so other tenants'
+        vectors are never scanned. With k=None every chunk in scope is returned,
+        giving every resume a real score.
+        
+        Returns:
+            List of (Document, cosine similarity) sorted best first
+        """
+        if resume_ids is not None:
+            resume_ids = list(resume_ids)
+        scoped_shards = self.shards.shards_for(resume_ids=resume_ids, user_id=user_id)
+        if not scoped_shards:
+            return []
+        
+        query_vector = np.array([self.embed_query(query)], dtype=np.float32)
+        results = []
+        for shard, shard_resume_ids in scoped_shards:
+            results.extend(shard.search(query_vector, resume_ids=shard_resume_ids, k=k))
+        
+        results.sort(key=lambda hit: hit[1], reverse=True)
+        return results[:k] if k is not None else results
     
-    def _compile_skill_patterns(self):
-        """Pre-compile regex patterns for skills"""
-        COMMON_SKILLS = [
-            "python","django","flask","aws","docker","spark","snowflake","node.js",
-            "kubernetes","terraform","sql","tableau","mongodb","etl","git","pandas",
-            "numpy","fastapi","react","postgresql","redis", "javascript", "typescript",
-            "c++", "java", "go", "rust", "linux", "azure", "gcp", "machine learning",
-            "deep learning", "nlp", "computer vision", "scikit-learn", "pytorch", "tensorflow"
-        ]
-        return {s: re.compile(r'\b' + re.escape(s.lower()) + r'\b') for s in COMMON_SKILLS}
-
     def extract_skills(self, text: str) -> List[str]:
-        """Extract skills using pre-compiled regex"""
-        txt = text.lower()
-        found = set()
-        for skill, pattern in self._skill_patterns.items():
-            if pattern.search(txt):
-                found.add(skill)
-        return sorted(list(found))
+        """Extract taxonomy skills (canonical names) in one scan of the text"""
+        return self._skill_extractor.extract(text)
 
     def extract_education(self, text: str) -> dict:
         """
@@ -489,6 +835,8 @@ class RAGService:
              info["phone"] = phones[0].strip()
              
         return info
+
+    def summarize_text(self, text: str) -> str:
         """Summarize text using T5 pipeline"""
         if not self.summarizer:
             return text[:200] + "..."
@@ -504,33 +852,92 @@ class RAGService:
 
     def generate_explanation(self, job_description: str, resume_text: str, matched_skills: List[str], rerank_score: float) -> str:
         """Generate LLM explanation for why a resume matches a job"""
-        if not self.llm_available or not self.llm:
-            return f"Match based on {len(matched_skills)} matched skills and semantic similarity score of {rerank_score:.2f}."
+        return self.generate_explanations(
+            job_description,
+            [{'skills': matched_skills, 'rerank_score': rerank_score}]
+        )[0]
+
+    def generate_explanations(self, job_description: str, candidates: List[Dict[str, Any]]) -> List[str]:
+        """
+        Generate match explanations for ranked candidates. Explanations already in the
+        LLM output cache are reused; the rest are generated in padded batches of
+        LLM_SUMMARY_BATCH_SIZE, retried one at a time if the batch fails.
         
-        try:
-            prompt = f"""Analyze why this resume matches the job description. Be concise (2-3 sentences).
+        Args:
+            candidates: Dicts with 'skills' (matched skills) and 'rerank_score'
+            
+        Returns:
+            One explanation per candidate, in input order
+        """
+        if not candidates:
+            return []
+        
+        skills = [(cand.get('skills') or [])[:10] for cand in candidates]
+        fallbacks = [
+            f"Match based on {len(cand.get('skills') or [])} matched skills and semantic similarity score of {cand['rerank_score']:.2f}."
+            for cand in candidates
+        ]
+        # The prompt only quotes the job, the skills and the score, so the resume text is not part of the key
+        job_hash = text_hash(job_description)
+        keys = [
+            (EXPLANATION_PROMPT_VERSION, job_hash, text_hash(', '.join(cand_skills)), score_bucket(cand['rerank_score']))
+            for cand, cand_skills in zip(candidates, skills)
+        ]
+        cached = self._cached_llm_outputs(keys)
+        explanations: List[Optional[str]] = [cached.get(key) for key in keys]
+        pending = [i for i, explanation in enumerate(explanations) if explanation is None]
+        if not pending or not self.llm_available or not self.llm:
+            return [explanation or fallback for explanation, fallback in zip(explanations, fallbacks)]
+        
+        prompts = {
+            i: f"""Analyze why this resume matches the job description. Be concise (2-3 sentences).
 
 Job Description:
 {job_description[:500]}
 
-Resume Skills: {', '.join(matched_skills[:10])}
-Match Score: {rerank_score:.2f}
+Resume Skills: {', '.join(skills[i])}
+Match Score: {candidates[i]['rerank_score']:.2f}
 
 Explanation:"""
-            
-            response = self.llm.invoke(prompt)
-            return response.strip()
+            for i in pending
+        }
+        generate_kwargs = {
+            "max_new_tokens": settings.LLM_SUMMARY_MAX_NEW_TOKENS,
+            "return_full_text": False
+        }
+        
+        try:
+            self._prepare_llm_batching()
+            responses = self.llm(list(prompts.values()), batch_size=max(1, settings.LLM_SUMMARY_BATCH_SIZE), **generate_kwargs)
+            for (i, prompt), response in zip(prompts.items(), responses):
+                explanations[i] = self._clean_selection_summary(response, prompt)
         except Exception as e:
-            logger.error(f"LLM explanation failed: {e}")
-            return f"Match based on {len(matched_skills)} matched skills and semantic similarity score of {rerank_score:.2f}."
+            logger.warning(f"⚠️ Batched explanation generation failed ({str(e)}), retrying per candidate")
+            for i, prompt in prompts.items():
+                try:
+                    explanations[i] = self._clean_selection_summary(self.llm(prompt, **generate_kwargs), prompt)
+                except Exception as item_error:
+                    logger.error(f"LLM explanation failed: {item_error}")
+        
+        generated = [i for i in pending if explanations[i]]
+        self._store_llm_outputs([keys[i] for i in generated], [explanations[i] for i in generated])
+        return [explanation or fallback for explanation, fallback in zip(explanations, fallbacks)]
 
-    def match_resumes_to_job(self, job_description: str, resumes: List[Dict], top_k: int = 50, top_n: int = 5) -> Dict:
+    def match_resumes_to_job(
+        self,
+        job_description: str,
+        resumes: List[Dict],
+        top_k: int = 50,
+        top_n: int = 5,
+        explain: bool = True
+    ) -> Dict:
         """
         Full RAG Pipeline with stage-by-stage logging (like Gradio demo):
         Stage 1: FAISS Search
         Stage 2: Rerank with CrossEncoder
         Stage 3: Summarize with T5
-        Stage 4: Generate explanations with LLM
+        Stage 4: Generate explanations with LLM (skipped when explain is False, so
+        callers can run generate_explanations in the executor's "generate" stage)
         """
         logger.info("=" * 80)
         logger.info("🚀 STARTING RESUME MATCHING PIPELINE")
@@ -543,22 +950,26 @@ Explanation:"""
         logger.info("🔍 STAGE 1: FAISS SEMANTIC SEARCH")
         logger.info("-" * 80)
         
-        if not self.vector_store:
+        # Score every chunk of the requested resumes only, keeping each resume's best chunk
+        resumes_by_id = {r.get("id"): r for r in resumes}
+        chunk_hits = self.search_resumes(job_description, resume_ids=resumes_by_id.keys())
+        if not chunk_hits:
             logger.error("❌ No vector store available")
             return {"error": "No resumes indexed", "stages": {}}
         
-        # Get embeddings and search
-        docs_and_scores = self.vector_store.similarity_search_with_score(job_description, k=min(top_k, len(resumes)))
+        best_chunks = {}
+        passages: Dict[int, List[str]] = {}
+        for doc, score in chunk_hits:
+            resume_id = doc.metadata.get("resume_id")
+            best_chunks.setdefault(resume_id, (doc, score))
+            passages.setdefault(resume_id, []).append(doc.page_content)
+        docs_and_scores = list(best_chunks.values())[:top_k]
         
         raw_results = []
         for i, (doc, score) in enumerate(docs_and_scores, 1):
             resume_id = doc.metadata.get("resume_id", "unknown")
-            candidate_name = doc.metadata.get("candidate_name", "Unknown")
-            
-            # Find full resume data
-            resume_data = next((r for r in resumes if str(r.get("id")) == str(resume_id)), None)
-            if not resume_data:
-                continue
+            resume_data = resumes_by_id[resume_id]
+            candidate_name = resume_data.get("candidate_name") or doc.metadata.get("candidate_name", "Unknown")
                 
             # Use skills from DB if available, otherwise extract from FULL text
             skills = resume_data.get("skills") or []
@@ -592,11 +1003,14 @@ Explanation:"""
             logger.warning("⚠️ Reranker not available, skipping reranking")
             ranked_results = raw_results[:top_n]
         else:
-            pairs = [[job_description, r["text"]] for r in raw_results]
-            rerank_scores = self.reranker.predict(pairs)
+            # Score each candidate on its top passages, not just the single best chunk
+            rerank_scores = self.rerank_resumes(
+                job_description,
+                {r["resume_id"]: passages[r["resume_id"]] for r in raw_results}
+            )
             
-            for i, (r, score) in enumerate(zip(raw_results, rerank_scores)):
-                r["rerank_score"] = float(score)
+            for r in raw_results:
+                r["rerank_score"] = float(rerank_scores[r["resume_id"]])
             
             ranked_results = sorted(raw_results, key=lambda x: x.get("rerank_score", 0), reverse=True)[:top_n]
             
@@ -619,21 +1033,17 @@ Explanation:"""
         logger.info("")
         
         # Stage 4: Generate Explanations
-        logger.info("💡 STAGE 4: GENERATING EXPLANATIONS WITH LLM")
-        logger.info("-" * 80)
-        
-        for i, r in enumerate(ranked_results, 1):
-            explanation = self.generate_explanation(
-                job_description,
-                r["text"],
-                r["skills"],
-                r.get("rerank_score", r["embedding_score"])
-            )
-            r["explanation"] = explanation
-            logger.info(f"  {i}. {r['candidate_name']}: {explanation[:100]}...")
-        
-        logger.info(f"✅ Generated {len(ranked_results)} explanations")
-        logger.info("")
+        if explain:
+            logger.info("💡 STAGE 4: GENERATING EXPLANATIONS WITH LLM")
+            logger.info("-" * 80)
+            
+            explanations = self.generate_explanations(job_description, explanation_inputs(ranked_results))
+            for i, (r, explanation) in enumerate(zip(ranked_results, explanations), 1):
+                r["explanation"] = explanation
+                logger.info(f"  {i}. {r['candidate_name']}: {explanation[:100]}...")
+            
+            logger.info(f"✅ Generated {len(ranked_results)} explanations")
+            logger.info("")
         
         logger.info("=" * 80)
         logger.info("✅ PIPELINE COMPLETE")
@@ -653,18 +1063,27 @@ Explanation:"""
             }
         }
 
-    def query(self, question: str, k: int = 20, top_n: int = 5) -> dict:
+    def query(
+        self,
+        question: str,
+        k: int = 20,
+        top_n: int = 5,
+        resume_ids: Optional[Iterable[int]] = None,
+        user_id: Optional[int] = None
+    ) -> dict:
         """
         Full RAG Pipeline:
-        1. Search (FAISS) -> Top K
+        1. Search (FAISS) -> Top K, scoped to resume_ids / user_id when given
         2. Rerank (CrossEncoder) -> Top N
         3. Summarize (T5)
         """
-        if self.vector_store is None:
-            return {"error": "No documents indexed"}
+        if resume_ids is None and user_id is None:
+            return {"error": "No search scope given"}
         
         # 1. Search (FAISS)
-        docs_and_scores = self.vector_store.similarity_search_with_score(question, k=k)
+        docs_and_scores = self.search_resumes(question, resume_ids=resume_ids, user_id=user_id, k=k)
+        if not docs_and_scores:
+            return {"error": "No documents indexed"}
         
         # Prepare for reranking
         raw_results = []
@@ -687,7 +1106,7 @@ Explanation:"""
             
         # 2. Rerank
         pairs = [[question, r["content"]] for r in raw_results]
-        rerank_scores = self.reranker.predict(pairs)
+        rerank_scores = self.rerank(pairs)
         
         for i, r in enumerate(raw_results):
             r["rerank_score"] = float(rerank_scores[i])
@@ -736,7 +1155,7 @@ Explanation:"""
             }
             
         # Use CrossEncoder to get a match score
-        score = self.reranker.predict([[job_description, resume_text]])[0]
+        score = self.rerank([[job_description, resume_text]])[0]
         
         # Normalize score
         import math
@@ -770,7 +1189,8 @@ Explanation:"""
         job_description: str,
         resume_texts: Dict[int, str],
         top_k: int = 50,
-        top_n: int = 10
+        top_n: int = 10,
+        with_summaries: bool = True
     ) -> List[Dict[str, Any]]:
         """
         Complete RAG pipeline for ranking resumes with LLM-generated summaries.
@@ -786,6 +1206,8 @@ Explanation:"""
             resume_texts: Dict mapping resume_id to resume text
             top_k: Number of candidates to retrieve from FAISS (default: 50)
             top_n: Number of top candidates to return with summaries (default: 10)
+            with_summaries: Skip step 4 when False; summaries are None and can be
+                filled later with generate_selection_summaries
             
         Returns:
             List of dicts with resume_id, score, and LLM-generated summary
@@ -798,10 +1220,6 @@ Explanation:"""
         logger.info(f"🔍 FAISS top_k: {top_k}")
         logger.info(f"🏆 Final top_n: {top_n}")
         
-        if not self.vector_store:
-            logger.error("❌ Vector store not initialized")
-            raise ValueError("Vector store not initialized. Please add documents first.")
-        
         if not self.reranker:
             logger.error("❌ Reranker not available")
             raise ValueError("Reranker not available")
@@ -812,73 +1230,38 @@ Explanation:"""
         logger.info("-" * 80)
         
         try:
-            # Search for top_k most similar documents
-            logger.info(f"🔍 Searching for top {top_k} candidates...")
-            search_results = self.vector_store.similarity_search_with_score(
-                job_description,
-                k=min(top_k * 3, len(resume_texts) * 10)  # Get more chunks to ensure coverage
-            )
+            # Score every chunk of the uploaded resumes (and nothing else)
+            logger.info(f"🔍 Scoring chunks of {len(resume_texts)} resumes...")
+            search_results = self.search_resumes(job_description, resume_ids=resume_texts.keys())
+            if not search_results:
+                logger.error("❌ Vector store not initialized")
+                raise ValueError("Vector store not initialized. Please add documents first.")
             
             logger.info(f"✅ Found {len(search_results)} document chunks")
             
-            # Group by resume and aggregate scores
-            resume_scores = {}
+            # Group by resume via the resume_id tagged on each chunk at ingest
+            resume_scores: Dict[int, List[float]] = {}
+            resume_passages: Dict[int, List[str]] = {}
             for doc, score in search_results:
-                source = doc.metadata.get('source', 'unknown')
-                if source not in resume_scores:
-                    resume_scores[source] = []
-                resume_scores[source].append((doc.page_content, score))
+                resume_id = doc.metadata.get('resume_id')
+                resume_scores.setdefault(resume_id, []).append(score)
+                resume_passages.setdefault(resume_id, []).append(doc.page_content)
             
             logger.info(f"📊 Grouped into {len(resume_scores)} unique resumes from FAISS")
             
-            # Find resume IDs from file paths - IMPROVED MATCHING
             faiss_candidates = []
-            matched_resume_ids = set()
-            
-            for source, chunks in resume_scores.items():
-                # Find matching resume ID by checking file path or content
-                matching_id = None
-                
-                # Try to match by source path first
-                for resume_id, text in resume_texts.items():
-                    if resume_id in matched_resume_ids:
-                        continue
-                    
-                    # Try multiple matching strategies
-                    # Strategy 1: Check if any chunk content is in resume text
-                    if any(chunk[0][:100] in text for chunk in chunks[:3]):
-                        matching_id = resume_id
-                        break
-                    
-                    # Strategy 2: Check if resume text contains any chunk (reverse)
-                    if any(text[:500] in chunk[0] or chunk[0] in text[:1000] for chunk in chunks[:3]):
-                        matching_id = resume_id
-                        break
+            for resume_id, text in resume_texts.items():
+                # Aggregate score (average of top 3 chunk similarities)
+                top_chunk_scores = sorted(resume_scores.get(resume_id, []), reverse=True)[:3]
+                if not top_chunk_scores:
+                    logger.warning(f"⚠️  Resume {resume_id} has no indexed chunks, scoring 0")
+                avg_score = sum(top_chunk_scores) / len(top_chunk_scores) if top_chunk_scores else 0.0
                 
-                if matching_id:
-                    matched_resume_ids.add(matching_id)
-                    # Aggregate score (average of top 3 chunks)
-                    top_chunk_scores = sorted([s for _, s in chunks], reverse=True)[:3]
-                    avg_score = sum(top_chunk_scores) / len(top_chunk_scores) if top_chunk_scores else 0
-                    
-                    faiss_candidates.append({
-                        'resume_id': matching_id,
-                        'faiss_score': avg_score,
-                        'text': resume_texts[matching_id]
-                    })
-            
-            # CRITICAL FIX: Add any resumes that weren't matched by FAISS
-            # This ensures ALL uploaded resumes are ranked, even if FAISS matching fails
-            unmatched_resume_ids = set(resume_texts.keys()) - matched_resume_ids
-            if unmatched_resume_ids:
-                logger.warning(f"⚠️  {len(unmatched_resume_ids)} resumes not matched by FAISS, adding with default score")
-                for resume_id in unmatched_resume_ids:
-                    faiss_candidates.append({
-                        'resume_id': resume_id,
-                        'faiss_score': 0.3,  # Default low score for unmatched
-                        'text': resume_texts[resume_id]
-                    })
-                    logger.info(f"  Added Resume {resume_id} with default score")
+                faiss_candidates.append({
+                    'resume_id': resume_id,
+                    'faiss_score': avg_score,
+                    'text': text
+                })
             
             # Sort by FAISS score and take top_k (or all if less than top_k)
             faiss_candidates = sorted(faiss_candidates, key=lambda x: x['faiss_score'], reverse=True)
@@ -902,11 +1285,14 @@ Explanation:"""
         try:
             logger.info(f"🔄 Reranking {len(faiss_candidates)} candidates...")
             
-            # Prepare pairs for reranking
-            pairs = [[job_description, cand['text'][:2000]] for cand in faiss_candidates]  # Limit text length
-            
-            # Get rerank scores
-            rerank_scores = self.reranker.predict(pairs)
+            # Score each resume on its top FAISS passages (falls back to the full text
+            # for resumes without indexed chunks)
+            passages = {
+                cand['resume_id']: resume_passages.get(cand['resume_id']) or [cand['text']]
+                for cand in faiss_candidates
+            }
+            passage_scores = self.rerank_resumes(job_description, passages)
+            rerank_scores = [passage_scores[cand['resume_id']] for cand in faiss_candidates]
             
             # Normalize scores using sigmoid
             import math
@@ -950,39 +1336,23 @@ Explanation:"""
         
         logger.info(f"📊 Selecting top {actual_top_n} out of {len(reranked_candidates)} candidates")
         
-        final_results = []
+        if with_summaries:
+            # Generate all summaries in padded batches rather than one pipeline call each
+            summaries = self.generate_selection_summaries(job_description, top_candidates)
+        else:
+            logger.info("⏭️  Summaries deferred to background generation")
+            summaries = [None] * len(top_candidates)
         
-        for idx, candidate in enumerate(top_candidates, 1):
-            logger.info(f"\n📝 Generating summary for candidate #{idx} (Resume {candidate['resume_id']})...")
-            
-            try:
-                # Generate LLM summary explaining why this resume was selected
-                summary = self._generate_selection_summary(
-                    job_description=job_description,
-                    resume_text=candidate['text'],
-                    rank=idx,
-                    score=candidate['rerank_score'],
-                    skills=candidate.get('skills', [])  # Pass pre-extracted skills
-                )
-                
-                logger.info(f"  ✅ Summary: {summary[:100]}...")
-                
-                final_results.append({
-                    'resume_id': candidate['resume_id'],
-                    'score': candidate['rerank_score'],
-                    'summary': summary,
-                    'skills': candidate.get('skills', [])  # Include skills in return data
-                })
-                
-            except Exception as e:
-                logger.error(f"  ❌ Failed to generate summary: {str(e)}")
-                # Fallback summary
-                final_results.append({
-                    'resume_id': candidate['resume_id'],
-                    'score': candidate['rerank_score'],
-                    'summary': f"Strong candidate with {candidate['rerank_score']:.1%} match score based on semantic similarity.",
-                    'skills': candidate.get('skills', [])  # Include skills in fallback too
-                })
+        final_results = []
+        for idx, (candidate, summary) in enumerate(zip(top_candidates, summaries), 1):
+            if summary:
+                logger.info(f"  #{idx} Resume {candidate['resume_id']}: {summary[:100]}...")
+            final_results.append({
+                'resume_id': candidate['resume_id'],
+                'score': candidate['rerank_score'],
+                'summary': summary,
+                'skills': candidate.get('skills', [])
+            })
         
         logger.info("\n" + "=" * 80)
         logger.info(f"✅ RAG PIPELINE COMPLETE: {len(final_results)} candidates ranked")
@@ -990,40 +1360,43 @@ Explanation:"""
         
         return final_results
 
-    def _generate_selection_summary(
-        self,
-        job_description: str,
-        resume_text: str,
-        rank: int,
-        score: float,
-        skills: List[str] = None
-    ) -> str:
+    def rerank_resumes(self, query: str, passages: Dict[int, List[str]]) -> Dict[int, float]:
         """
-        Generate LLM summary explaining why a resume was selected.
+        Score each resume on its top FAISS passages and aggregate them
+        (RERANK_AGGREGATION). Up to RERANK_CHUNKS_PER_RESUME passages are scored per
+        resume, reduced so the whole request stays within RERANK_MAX_PAIRS
+        cross-encoder pairs (every resume always gets at least one).
         
         Args:
-            job_description: The job requirements
-            resume_text: The candidate's resume text
-            rank: The candidate's rank (1, 2, 3, etc.)
-            score: The match score
-            skills: Pre-extracted skills list (optional)
+            query: Job description / question
+            passages: resume_id -> passages ordered best FAISS match first
             
         Returns:
-            LLM-generated explanation string
+            resume_id -> aggregated raw CrossEncoder score
         """
-        
-        # Use provided skills or extract if not provided
-        if not skills:
-            skills = self.extract_skills(resume_text)
-        
-        if not self.llm_available or not self.llm:
-            # Fallback: Use provided skills to create basic summary
-            skills_text = ', '.join(skills) if skills else 'relevant technical skills'
-            return f"Ranked #{rank} with {score:.1%} match. Key skills: {skills_text}. Strong alignment with job requirements."
-        
-        try:
-            # Create prompt for LLM
-            prompt = f"""Analyze why this resume is a good match for the job.
+        if not passages:
+            return {}
+        per_resume = max(1, min(settings.RERANK_CHUNKS_PER_RESUME, settings.RERANK_MAX_PAIRS // len(passages)))
+        
+        owners, pairs = [], []
+        for resume_id, texts in passages.items():
+            for text in texts[:per_resume]:
+                owners.append(resume_id)
+                pairs.append([query, text])
+        
+        logger.info(f"🔄 Scoring {len(pairs)} passages ({per_resume} per resume, {settings.RERANK_AGGREGATION})")
+        scores = self.rerank(pairs)
+        
+        grouped: Dict[int, List[float]] = {}
+        for resume_id, score in zip(owners, scores):
+            grouped.setdefault(resume_id, []).append(score)
+        return {
+            resume_id: aggregate_passage_scores(resume_scores, settings.RERANK_AGGREGATION)
+            for resume_id, resume_scores in grouped.items()
+        }
+
+    def _selection_summary_prompt(self, job_description: str, resume_text: str) -> str:
+        return f"""Analyze why this resume is a good match for the job.
 
 Job Requirements:
 {job_description[:500]}
@@ -1037,34 +1410,166 @@ Provide a concise 2-3 sentence explanation of why this candidate was selected, f
 3. Key strengths
 
 Summary:"""
+
+    def _clean_selection_summary(self, response: Any, prompt: str) -> str:
+        # Pipeline returns list of dicts: [{'generated_text': '...'}]
+        if isinstance(response, list) and len(response) > 0 and 'generated_text' in response[0]:
+            summary = response[0]['generated_text']
+        else:
+            summary = str(response)
             
-            # Generate summary
-            # Note: self.llm is a transformers pipeline, not a LangChain object
-            response = self.llm(prompt)
-            
-            # Parse response - pipeline returns list of dicts: [{'generated_text': '...'}]
-            if isinstance(response, list) and len(response) > 0 and 'generated_text' in response[0]:
-                summary = response[0]['generated_text']
-            else:
-                summary = str(response)
-                
-            # Clean up response - remove prompt if it's included
-            if summary.startswith(prompt):
-                summary = summary[len(prompt):].strip()
-            
-            summary = summary.strip()
-            
-            # Ensure it's not too long
-            if len(summary) > 300:
-                summary = summary[:297] + "..."
-            
-            return summary
+        # Clean up response - remove prompt if it's included
+        if summary.startswith(prompt):
+            summary = summary[len(prompt):]
+        summary = summary.strip()
+        
+        # Ensure it's not too long
+        if len(summary) > 300:
+            summary = summary[:297] + "..."
+        return summary
+
+    def _fallback_selection_summary(self, rank: int, score: float, skills: List[str]) -> str:
+        skills_text = ', '.join(skills) if skills else 'relevant technical skills'
+        return f"Ranked #{rank} with {score:.1%} match. Key skills: {skills_text}. Strong alignment with job requirements."
+
+    def _prepare_llm_batching(self):
+        """Decoder-only models need a pad token and left padding to generate in batches"""
+        tokenizer = getattr(self.llm, "tokenizer", None)
+        if tokenizer is None:
+            return
+        if tokenizer.pad_token_id is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = "left"
+
+    def stream_llm(self, inputs, cancelled: Optional[threading.Event] = None, **kwargs) -> Iterator[str]:
+        """
+        Yield generated text as the LLM produces it. Generation runs on a worker
+        thread (or on the model server) and stops early once `cancelled` is set or
+        the generator is closed.
+        """
+        if self.model_client:
+            yield from self.llm.stream(inputs, cancelled=cancelled, **kwargs)
+            return
+        
+        from transformers import TextIteratorStreamer, StoppingCriteria, StoppingCriteriaList
+        
+        stop = cancelled or threading.Event()
+        
+        class _Cancelled(StoppingCriteria):
+            def __call__(self, input_ids, scores, **criteria_kwargs):
+                return stop.is_set()
+        
+        streamer = TextIteratorStreamer(self.llm.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors: List[Exception] = []
+        
+        def run():
+            try:
+                self.llm(
+                    inputs,
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([_Cancelled()]),
+                    **kwargs
+                )
+            except Exception as e:
+                errors.append(e)
+                # Unblock the consumer if generation failed before finishing the stream
+                streamer.end()
+        
+        threading.Thread(target=run, name="llm-stream", daemon=True).start()
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+            if errors:
+                raise errors[0]
+        finally:
+            stop.set()
+
+    def generate_selection_summaries(self, job_description: str, candidates: List[Dict[str, Any]]) -> List[str]:
+        """
+        Generate selection summaries for the top candidates. Summaries already in the
+        LLM output cache are reused; the rest go through the pipeline in padded batches of
+        LLM_SUMMARY_BATCH_SIZE with a LLM_SUMMARY_MAX_NEW_TOKENS budget. If a batch
+        fails, its candidates are retried one at a time; a candidate that still fails
+        (or comes back empty) gets the skills-based fallback summary.
+        
+        Args:
+            candidates: Ranked candidate dicts with 'text', 'rerank_score' and optional 'skills' / 'rank'
             
+        Returns:
+            One summary per candidate, in input order
+        """
+        if not candidates:
+            return []
+        
+        skills = [cand.get('skills') or self.extract_skills(cand['text']) for cand in candidates]
+        fallbacks = [
+            self._fallback_selection_summary(cand.get('rank', rank), cand['rerank_score'], cand_skills)
+            for rank, (cand, cand_skills) in enumerate(zip(candidates, skills), 1)
+        ]
+        job_hash = text_hash(job_description)
+        keys = [
+            (SELECTION_SUMMARY_PROMPT_VERSION, job_hash, text_hash(cand['text']), rank_bucket(cand.get('rank', rank)))
+            for rank, cand in enumerate(candidates, 1)
+        ]
+        cached = self._cached_llm_outputs(keys)
+        summaries: List[Optional[str]] = [cached.get(key) for key in keys]
+        pending = [i for i, summary in enumerate(summaries) if summary is None]
+        if cached:
+            logger.info(f"♻️ {len(cached)} of {len(keys)} summaries served from cache")
+        if not pending or not self.llm_available or not self.llm:
+            return [summary or fallback for summary, fallback in zip(summaries, fallbacks)]
+        
+        prompts = {i: self._selection_summary_prompt(job_description, candidates[i]['text']) for i in pending}
+        generate_kwargs = {
+            "max_new_tokens": settings.LLM_SUMMARY_MAX_NEW_TOKENS,
+            "return_full_text": False
+        }
+        
+        try:
+            self._prepare_llm_batching()
+            batch_size = max(1, settings.LLM_SUMMARY_BATCH_SIZE)
+            logger.info(f"📝 Generating {len(prompts)} summaries (batch size {batch_size})...")
+            responses = self.llm(list(prompts.values()), batch_size=batch_size, **generate_kwargs)
+            for (i, prompt), response in zip(prompts.items(), responses):
+                summaries[i] = self._clean_selection_summary(response, prompt)
         except Exception as e:
-            logger.warning(f"LLM summary generation failed: {str(e)}")
-            # Fallback with provided skills
-            skills_text = ', '.join(skills) if skills else 'relevant technical skills'
-            return f"Selected for strong background and {score:.1%} match score. Key skills: {skills_text}."
+            logger.warning(f"⚠️ Batched summary generation failed ({str(e)}), retrying per candidate")
+            for i, prompt in prompts.items():
+                try:
+                    summaries[i] = self._clean_selection_summary(self.llm(prompt, **generate_kwargs), prompt)
+                except Exception as item_error:
+                    logger.warning(f"LLM summary generation failed for candidate #{i + 1}: {str(item_error)}")
+        
+        generated = [i for i in pending if summaries[i]]
+        self._store_llm_outputs([keys[i] for i in generated], [summaries[i] for i in generated])
+        return [summary or fallback for summary, fallback in zip(summaries, fallbacks)]
+
+    def _generate_selection_summary(
+        self,
+        job_description: str,
+        resume_text: str,
+        rank: int,
+        score: float,
+        skills: List[str] = None
+    ) -> str:
+        """
+        Generate LLM summary explaining why a resume was selected.
+        
+        Args:
+            job_description: The job requirements
+            resume_text: The candidate's resume text
+            rank: The candidate's rank (1, 2, 3, etc.)
+            score: The match score
+            skills: Pre-extracted skills list (optional)
+            
+        Returns:
+            LLM-generated explanation string
+        """
+        return self.generate_selection_summaries(
+            job_description,
+            [{'text': resume_text, 'rerank_score': score, 'skills': skills or [], 'rank': rank}]
+        )[0]
 
 # Global RAG service instance
 rag_service = RAGService()
@@ -0,0 +1,123 @@
+"""
+Persistent CrossEncoder score cache.
+
+Scores are keyed by (reranker model and max sequence length, sha256 of the query,
+sha256 of the passage) in SQLite, so re-ranking an unchanged job against unchanged
+resumes never reaches reranker.predict again. The max length is part of the key
+because pairs are truncated to it, so changing RERANK_MAX_TOKENS changes the scores.
+"""
+import os
+import logging
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from app.services.embedding_cache import text_hash
+
+logger = logging.getLogger(__name__)
+
+_SQL_BATCH = 400
+
+
+class PairScoreCache:
+    """SQLite-backed (model, query hash, passage hash) -> score store with hit/miss counters"""
+
+    def __init__(self, path: str, model_name: str, max_length: int):
+        self.path = path
+        # Stored in the model column, so scores from another truncation length never match
+        self.model_name = f"{model_name}@{max_length}"
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pair_scores (
+                model TEXT NOT NULL,
+                query_hash TEXT NOT NULL,
+                passage_hash TEXT NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (model, query_hash, passage_hash)
+            )"""
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], float]:
+        """Return cached scores for (query hash, passage hash) keys"""
+        found: Dict[Tuple[str, str], float] = {}
+        by_query: Dict[str, List[str]] = {}
+        for query_hash, passage_hash in dict.fromkeys(keys):
+            by_query.setdefault(query_hash, []).append(passage_hash)
+
+        with self._lock:
+            for query_hash, passage_hashes in by_query.items():
+                for start in range(0, len(passage_hashes), _SQL_BATCH):
+                    batch = passage_hashes[start:start + _SQL_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT passage_hash, score FROM pair_scores "
+                        f"WHERE model = ? AND query_hash = ? AND passage_hash IN ({placeholders})",
+                        [self.model_name, query_hash, *batch]
+                    ).fetchall()
+                    for passage_hash, score in rows:
+                        found[(query_hash, passage_hash)] = score
+            hit_count = sum(1 for key in keys if key in found)
+            self.hits += hit_count
+            self.misses += len(keys) - hit_count
+        return found
+
+    def put_many(self, keys: List[Tuple[str, str]], scores: List[float]):
+        rows = [
+            (self.model_name, query_hash, passage_hash, float(score))
+            for (query_hash, passage_hash), score in zip(keys, scores)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pair_scores (model, query_hash, passage_hash, score) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute(
+                "SELECT COUNT(*) FROM pair_scores WHERE model = ?", [self.model_name]
+            ).fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": size
+            }
+
+    def score(self, pairs: Sequence[Sequence[str]], predict: Callable[[List[List[str]]], Sequence[float]]) -> List[float]:
+        """
+        Score pairs, sending only uncached ones to predict. Results come back in the
+        order of the input pairs.
+        """
+        keys = [(text_hash(query), text_hash(passage)) for query, passage in pairs]
+        try:
+            cached = self.get_many(keys)
+        except Exception as e:
+            logger.warning(f"⚠️ Rerank cache lookup failed: {str(e)}")
+            cached = {}
+
+        missing: Dict[Tuple[str, str], List[str]] = {}
+        for key, pair in zip(keys, pairs):
+            if key not in cached and key not in missing:
+                missing[key] = [pair[0], pair[1]]
+
+        if missing:
+            fresh = [float(score) for score in predict(list(missing.values()))]
+            cached.update(zip(missing.keys(), fresh))
+            try:
+                self.put_many(list(missing.keys()), fresh)
+            except Exception as e:
+                logger.warning(f"⚠️ Rerank cache write failed: {str(e)}")
+
+        return [cached[key] for key in keys]
@@ -0,0 +1,91 @@
+"""
+Length-bucketed CrossEncoder scoring.
+
+Pairs are sorted by token length so each batch pads to a similar length, batch
+sizes shrink as sequences get longer (a fixed token budget per batch), and every
+sequence is capped at the model's maximum. Scores are returned in input order.
+"""
+import logging
+from typing import List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on characters per token, used to trim passages before tokenizing
+CHARS_PER_TOKEN = 8
+
+
+class RerankEngine:
+    """Wraps a sentence-transformers CrossEncoder with length-bucketed batching"""
+
+    def __init__(self, model, batch_size: int = 32, max_tokens: int = 512, tokens_per_batch: int = 16384):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        model_max = getattr(model, "max_length", None) or getattr(model.tokenizer, "model_max_length", max_tokens)
+        self.max_tokens = min(max_tokens, model_max)
+        self.tokens_per_batch = max(self.max_tokens, tokens_per_batch)
+
+    def _trim(self, pairs: Sequence[Sequence[str]]) -> List[List[str]]:
+        # Anything past max_tokens is truncated by the tokenizer anyway
+        max_chars = self.max_tokens * CHARS_PER_TOKEN
+        return [[query[:max_chars], passage[:max_chars]] for query, passage in pairs]
+
+    def token_lengths(self, pairs: List[List[str]]) -> List[int]:
+        """Truncated token length of each pair"""
+        try:
+            encoded = self.model.tokenizer(
+                [p[0] for p in pairs],
+                [p[1] for p in pairs],
+                truncation=True,
+                max_length=self.max_tokens
+            )
+            return [len(ids) for ids in encoded["input_ids"]]
+        except Exception as e:
+            logger.warning(f"⚠️ Tokenizer length probe failed ({str(e)}), using character estimate")
+            return [min(self.max_tokens, (len(p[0]) + len(p[1])) // 4 + 3) for p in pairs]
+
+    def predict(self, pairs: Sequence[Sequence[str]]) -> List[float]:
+        """Score pairs in length-sorted buckets; scores come back in input order"""
+        if not pairs:
+            return []
+        pairs = self._trim(pairs)
+        lengths = self.token_lengths(pairs)
+        order = sorted(range(len(pairs)), key=lengths.__getitem__)
+
+        scores = [0.0] * len(pairs)
+        start = 0
+        while start < len(order):
+            # Longest sequence if we took a full batch; shrink the batch to fit the token budget
+            window_end = min(start + self.batch_size, len(order))
+            longest = max(1, lengths[order[window_end - 1]])
+            size = max(1, min(self.batch_size, self.tokens_per_batch // longest))
+            bucket = order[start:start + size]
+
+            bucket_scores = self.model.predict(
+                [pairs[i] for i in bucket],
+                batch_size=len(bucket),
+                show_progress_bar=False
+            )
+            for i, score in zip(bucket, bucket_scores):
+                scores[i] = float(score)
+            start += size
+
+        return scores
+
+
+def aggregate_passage_scores(scores: Sequence[float], mode: str = "max") -> float:
+    """
+    Combine per-passage scores of one resume into a single score.
+    
+    Modes: "max" (MaxP), "mean_top2" (mean of the two best passages) and
+    "weighted" (best passages weighted 1, 1/2, 1/4, ...).
+    """
+    ranked = sorted(scores, reverse=True)
+    if not ranked:
+        return 0.0
+    if mode == "mean_top2":
+        top = ranked[:2]
+        return sum(top) / len(top)
+    if mode == "weighted":
+        weights = [0.5 ** i for i in range(len(ranked))]
+        return sum(w * s for w, s in zip(weights, ranked)) / sum(weights)
+    return ranked[0]
@@ -0,0 +1,94 @@
+"""
+Content-addressed resume store.
+
+Every parsed resume is registered under its owner and the SHA-256 of the
+uploaded PDF. Re-uploading the same file (to another job, or twice in one
+request) reuses the existing Resume row - its text, extracted fields, chunks
+and vectors - and only records the job association, so nothing is parsed,
+OCR'd or embedded again and FAISS never holds duplicate entries that would
+skew rankings.
+
+All helpers stage rows in the caller's transaction; the caller commits.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import bulk_insert
+from app.models import Resume, ResumeFile, ResumeJob
+
+
+def find_resumes_by_hash(db: Session, user_id: int, hashes: Iterable[str]) -> Dict[str, int]:
+    """Map each already-stored file hash of the user to its resume id"""
+    hashes = set(hashes)
+    if not hashes:
+        return {}
+    rows = db.query(ResumeFile.sha256, ResumeFile.resume_id).filter(
+        ResumeFile.user_id == user_id,
+        ResumeFile.sha256.in_(hashes)
+    ).all()
+    return {sha256: resume_id for sha256, resume_id in rows}
+
+
+def register_resume_files(db: Session, user_id: int, resume_hashes: Dict[int, str]):
+    """Record the file hash of newly inserted resumes (resume_id -> sha256)"""
+    bulk_insert(db, ResumeFile, [
+        {"user_id": user_id, "sha256": sha256, "resume_id": resume_id}
+        for resume_id, sha256 in resume_hashes.items()
+    ])
+
+
+def associate_resumes_with_job(db: Session, job_id: Optional[int], resume_ids: Iterable[int]) -> List[int]:
+    """Link resumes to a job, skipping existing links; returns the newly linked ids"""
+    if job_id is None:
+        return []
+    wanted = list(dict.fromkeys(resume_ids))
+    if not wanted:
+        return []
+    existing = {
+        resume_id for (resume_id,) in db.query(ResumeJob.resume_id).filter(
+            ResumeJob.job_id == job_id,
+            ResumeJob.resume_id.in_(wanted)
+        ).all()
+    }
+    new_ids = [resume_id for resume_id in wanted if resume_id not in existing]
+    bulk_insert(db, ResumeJob, [{"resume_id": resume_id, "job_id": job_id} for resume_id in new_ids])
+    return new_ids
+
+
+def resume_texts(db: Session, resume_ids: Iterable[int]) -> Dict[int, str]:
+    """Stored text of reused resumes, for ranking them alongside new uploads"""
+    resume_ids = list(resume_ids)
+    if not resume_ids:
+        return {}
+    rows = db.query(Resume.id, Resume.text_content).filter(Resume.id.in_(resume_ids)).all()
+    return {resume_id: text or "" for resume_id, text in rows}
+
+
+def orphaned_resume_ids(db: Session, indexed_ids: Iterable[int], grace_seconds: int) -> List[int]:
+    """
+    Indexed resume ids without a Resume row that were reserved more than
+    grace_seconds ago: vectors of an upload that crashed before its commit.
+    Ids increase in reservation order, so an id below that of a resume created
+    before the cutoff is older than the cutoff and can't belong to an upload in flight.
+    """
+    indexed_ids = set(indexed_ids)
+    if not indexed_ids:
+        return []
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+    watermark = db.query(func.max(Resume.id)).filter(Resume.created_at < cutoff).scalar()
+    if watermark is None:
+        return []
+    candidates = [resume_id for resume_id in indexed_ids if resume_id < watermark]
+    if not candidates:
+        return []
+    existing = {resume_id for (resume_id,) in db.query(Resume.id).filter(Resume.id.in_(candidates)).all()}
+    return sorted(set(candidates) - existing)
+
+
+def forget_resumes(db: Session, resume_ids: List[int]):
+    """Drop hash and job links of resumes that are being deleted"""
+    db.query(ResumeFile).filter(ResumeFile.resume_id.in_(resume_ids)).delete(synchronize_session=False)
+    db.query(ResumeJob).filter(ResumeJob.resume_id.in_(resume_ids)).delete(synchronize_session=False)
@@ -0,0 +1,120 @@
+"""
+Single-pass skill extraction.
+
+The skill taxonomy (canonical names plus aliases) is loaded from a JSON data
+file and compiled into one regular expression whose alternation is factored
+into a character trie, so the regex engine walks each text position through
+shared prefixes instead of trying every skill in turn. A single finditer over
+the lower-cased, whitespace-normalized text finds all skills; cost grows with
+the text, not with the size of the taxonomy.
+
+Matching is longest-first ("spring boot" rather than "spring"). Shorter terms
+contained in a match at word boundaries ("aws" in "aws s3") are precomputed at
+load time and reported too, so results are the same as matching every skill
+independently.
+
+Taxonomy file format:
+    {"version": 1, "skills": {"python": ["python3"], "kubernetes": ["k8s"], ...}}
+"""
+import os
+import re
+import json
+import logging
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skill_taxonomy.json")
+
+# A term must not be glued to surrounding word characters; '+', '#' and '.'
+# count as part of a word so "c" never matches inside "c++", "c#" or "asp.net"
+_LEFT_GLUE = set("+#.")
+_RIGHT_GLUE = set("+#")
+_LEFT_BOUNDARY = r"(?<![\w+#.])"
+_RIGHT_BOUNDARY = r"(?![\w+#])"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.lower()).strip()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _trie_pattern(terms: List[str]) -> str:
+    """Prefix-factored alternation of terms; longer continuations are tried first"""
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        ends_here = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            return ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class SkillExtractor:
+    """Finds taxonomy skills in text with one compiled pattern"""
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        # surface form -> canonical skill
+        self.terms: Dict[str, str] = {}
+        for skill, aliases in taxonomy.items():
+            canonical = normalize(skill)
+            for term in [skill, *aliases]:
+                term = normalize(term)
+                if not term:
+                    continue
+                if term in self.terms and self.terms[term] != canonical:
+                    logger.warning(f"⚠️ Skill alias '{term}' is listed under '{self.terms[term]}' and '{canonical}', keeping the first")
+                    continue
+                self.terms[term] = canonical
+        self.skill_count = len(set(self.terms.values()))
+
+        # Canonical skills reported for each matched term (itself plus contained terms)
+        self._implied: Dict[str, Set[str]] = {term: self._contained_skills(term) for term in self.terms}
+
+        self._pattern: Optional[re.Pattern] = None
+        if self.terms:
+            self._pattern = re.compile(_LEFT_BOUNDARY + "(" + _trie_pattern(list(self.terms)) + ")" + _RIGHT_BOUNDARY)
+
+    def _contained_skills(self, term: str) -> Set[str]:
+        """Skills whose terms occur inside term at word boundaries (including term itself)"""
+        starts = [i for i in range(len(term)) if i == 0 or not (_is_word_char(term[i - 1]) or term[i - 1] in _LEFT_GLUE)]
+        ends = [j for j in range(1, len(term) + 1) if j == len(term) or not (_is_word_char(term[j]) or term[j] in _RIGHT_GLUE)]
+        found = set()
+        for i in starts:
+            for j in ends:
+                if j > i and term[i:j] in self.terms:
+                    found.add(self.terms[term[i:j]])
+        return found
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillExtractor":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        extractor = cls(data.get("skills", {}))
+        logger.info(f"🧩 Loaded {extractor.skill_count} skills ({len(extractor.terms)} terms) from {path}")
+        return extractor
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in text, sorted"""
+        if self._pattern is None or not text:
+            return []
+        found: Set[str] = set()
+        for match in self._pattern.finditer(normalize(text)):
+            found.update(self._implied[match.group(1)])
+        return sorted(found)
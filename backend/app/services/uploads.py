@@ -0,0 +1,66 @@
+"""
+Streaming upload storage.
+
+Uploaded files are copied to a temp file in UPLOAD_DIR in fixed-size chunks,
+with the size limit enforced as bytes arrive and a SHA-256 computed on the
+fly, then atomically renamed to their final name. Peak memory per file is one
+chunk no matter how large the upload or how many files a request carries.
+"""
+import os
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass
+
+from fastapi import UploadFile
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the size limit; nothing is left on disk"""
+
+
+@dataclass
+class StoredUpload:
+    path: str
+    size: int
+    sha256: str
+
+
+async def store_upload(
+    file: UploadFile,
+    filename: str,
+    max_bytes: int,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE_KB * 1024
+) -> StoredUpload:
+    """
+    Stream file into UPLOAD_DIR/filename.
+
+    Raises:
+        UploadTooLarge: once more than max_bytes have been received
+    """
+    final_path = os.path.join(settings.UPLOAD_DIR, filename)
+    digest = hashlib.sha256()
+    size = 0
+    # Same directory as the target so the final rename is atomic
+    fd, temp_path = tempfile.mkstemp(dir=settings.UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{file.filename} exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+        os.replace(temp_path, final_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return StoredUpload(path=final_path, size=size, sha256=digest.hexdigest())
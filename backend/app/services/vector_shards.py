@@ -0,0 +1,555 @@
+"""
+Per-user FAISS shards with on-disk persistence, lazy loading and LRU eviction.
+
+Each tenant gets its own FAISS store under VECTOR_STORE_DIR/<shard>/ together with
+an id_map.json (resume_id -> docstore ids). Shards are loaded on first access and
+the least recently used ones are dropped once the memory budget is hit.
+
+Several API worker processes can share VECTOR_STORE_DIR. Every change to a shard
+or to owners.json is a read-modify-write under an flock on a sibling .lock file:
+the file is reloaded if another process saved it since we last read it, changed,
+and saved before the lock is released. Readers reload shards whose files changed
+on disk, so resumes indexed in one worker are searchable from every other.
+"""
+import os
+import json
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, run a single worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SHARED_SHARD = "shared"
+INDEX_NAME = "index"
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False):
+    """Advisory cross-process lock (flock) on path; a no-op where fcntl is missing"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def disk_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """(newest mtime_ns, total size) of the files in a shard directory, None if absent"""
+    try:
+        stats = [entry.stat() for entry in os.scandir(path) if entry.is_file()]
+    except FileNotFoundError:
+        return None
+    if not stats:
+        return None
+    return max(st.st_mtime_ns for st in stats), sum(st.st_size for st in stats)
+
+
+class VectorShard:
+    """One tenant's FAISS store plus its resume_id -> docstore id map"""
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self.store = None
+        self.resume_vector_ids: Dict[int, List[str]] = {}
+        self.text_bytes = 0
+        # Docstore ids of deleted chunks still present in the index until compaction
+        self.tombstones: Set[str] = set()
+        self.dirty = False
+        self.lock = threading.RLock()
+        # Callers currently holding this shard; pinned shards are never evicted
+        self.pins = 0
+        # disk_stamp() of the files this copy was loaded from or last saved to
+        self.stamp: Optional[Tuple[int, int]] = None
+        # docstore id -> FAISS row, rebuilt lazily after the index changes
+        self._docstore_positions: Optional[Dict[str, int]] = None
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate resident size: float32 vectors plus chunk text"""
+        if self.store is None:
+            return 0
+        index = self.store.index
+        return index.ntotal * index.d * 4 + self.text_bytes
+
+    def add(
+        self,
+        texts: List[str],
+        vectors: List[List[float]],
+        metadatas: List[dict],
+        ids: List[str],
+        embeddings
+    ):
+        """Append pre-computed embeddings straight to this shard's index and docstore"""
+        from langchain_community.vectorstores import FAISS
+        with self.lock:
+            text_embeddings = list(zip(texts, vectors))
+            if self.store is None:
+                self.store = FAISS.from_embeddings(text_embeddings, embeddings, metadatas=metadatas, ids=ids)
+            else:
+                self.store.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+
+            # Extend rather than replace, so a resume indexed in several calls keeps every chunk id
+            for doc_id, metadata in zip(ids, metadatas):
+                self.resume_vector_ids.setdefault(metadata["resume_id"], []).append(doc_id)
+
+            self.text_bytes += sum(len(t) for t in texts)
+            self._docstore_positions = None
+            self.dirty = True
+
+    @property
+    def tombstone_ratio(self) -> float:
+        if self.store is None or self.store.index.ntotal == 0:
+            return 0.0
+        return len(self.tombstones) / self.store.index.ntotal
+
+    def delete_resumes(self, resume_ids: Iterable[int]) -> int:
+        """Tombstone the chunks of the given resumes; returns how many were removed"""
+        with self.lock:
+            removed = 0
+            for resume_id in resume_ids:
+                doc_ids = self.resume_vector_ids.pop(resume_id, [])
+                for doc_id in doc_ids:
+                    doc = self.store.docstore.search(doc_id)
+                    self.text_bytes -= len(getattr(doc, "page_content", ""))
+                self.tombstones.update(doc_ids)
+                removed += len(doc_ids)
+            if removed:
+                self.dirty = True
+            return removed
+
+    def compact(self):
+        """Physically drop tombstoned rows, rebuilding the index and docstore"""
+        with self.lock:
+            if not self.tombstones or self.store is None:
+                return
+            count = len(self.tombstones)
+            self.store.delete(list(self.tombstones))
+            self.tombstones.clear()
+            self._docstore_positions = None
+            self.dirty = True
+            logger.info(f"🧹 Compacted vector shard '{self.name}': dropped {count} vectors, {self.store.index.ntotal} remain")
+
+    def positions_for(self, resume_ids: Iterable[int]) -> List[int]:
+        """Map resume_ids to FAISS row positions through the id map"""
+        if self._docstore_positions is None:
+            self._docstore_positions = {
+                doc_id: pos for pos, doc_id in self.store.index_to_docstore_id.items()
+            }
+        positions = []
+        for resume_id in resume_ids:
+            for doc_id in self.resume_vector_ids.get(resume_id, []):
+                pos = self._docstore_positions.get(doc_id)
+                if pos is not None:
+                    positions.append(pos)
+        return positions
+
+    def search(
+        self,
+        query_vector: np.ndarray,
+        resume_ids: Optional[Iterable[int]] = None,
+        k: Optional[int] = None
+    ) -> List[Tuple[Any, float]]:
+        """
+        Score chunks in this shard, optionally restricted to resume_ids via an
+        IDSelectorBatch. Returns (Document, cosine similarity) best first.
+        """
+        import faiss
+        with self.lock:
+            if self.store is None or self.store.index.ntotal == 0:
+                return []
+
+            params = None
+            if resume_ids is None and self.tombstones:
+                # Restrict to live resumes so tombstoned rows are never returned
+                resume_ids = list(self.resume_vector_ids.keys())
+            if resume_ids is None:
+                candidates = self.store.index.ntotal
+            else:
+                positions = self.positions_for(resume_ids)
+                if not positions:
+                    return []
+                candidates = len(positions)
+                selector = faiss.IDSelectorBatch(np.array(positions, dtype=np.int64))
+                params = faiss.SearchParameters(sel=selector)
+
+            k = candidates if k is None else min(k, candidates)
+            distances, rows = self.store.index.search(query_vector, k, params=params)
+
+            results = []
+            for distance, row in zip(distances[0], rows[0]):
+                if row == -1:
+                    continue
+                doc = self.store.docstore.search(self.store.index_to_docstore_id[int(row)])
+                # Embeddings are L2-normalized, so squared L2 distance maps to cosine similarity
+                results.append((doc, 1.0 - float(distance) / 2.0))
+            return results
+
+    def save(self):
+        """Write index, docstore and id map; each file is swapped in atomically"""
+        with self.lock:
+            if self.store is None or not self.dirty:
+                return
+            parent = os.path.dirname(self.path) or "."
+            os.makedirs(parent, exist_ok=True)
+            tmp_path = tempfile.mkdtemp(dir=parent, prefix=f".{self.name}.")
+            try:
+                self.store.save_local(tmp_path, index_name=INDEX_NAME)
+                with open(os.path.join(tmp_path, "id_map.json"), "w") as f:
+                    json.dump({str(k): v for k, v in self.resume_vector_ids.items()}, f)
+
+                os.makedirs(self.path, exist_ok=True)
+                for file_name in os.listdir(tmp_path):
+                    os.replace(os.path.join(tmp_path, file_name), os.path.join(self.path, file_name))
+            finally:
+                for file_name in os.listdir(tmp_path):
+                    os.remove(os.path.join(tmp_path, file_name))
+                os.rmdir(tmp_path)
+            self.dirty = False
+            self.stamp = disk_stamp(self.path)
+            logger.info(f"💾 Flushed vector shard '{self.name}' ({self.store.index.ntotal} vectors)")
+
+    def is_stale(self) -> bool:
+        """True if another process saved this shard since we loaded or saved it"""
+        return VectorShard.exists_on_disk(self.path) and disk_stamp(self.path) != self.stamp
+
+    @classmethod
+    def exists_on_disk(cls, path: str) -> bool:
+        return os.path.exists(os.path.join(path, f"{INDEX_NAME}.faiss"))
+
+    @classmethod
+    def load(cls, name: str, path: str, embeddings) -> "VectorShard":
+        """Load a shard from disk, rebuilding the id map from metadata if missing"""
+        shard = cls(name, path)
+        shard.reload(embeddings)
+        return shard
+
+    def reload(self, embeddings):
+        """Replace the in-memory copy with what is on disk (caller holds the file lock)"""
+        from langchain_community.vectorstores import FAISS
+        with self.lock:
+            self.store = FAISS.load_local(
+                self.path,
+                embeddings,
+                index_name=INDEX_NAME,
+                allow_dangerous_deserialization=True
+            )
+            self.resume_vector_ids = {}
+            self.tombstones = set()
+            self.text_bytes = 0
+            self._docstore_positions = None
+            self.dirty = False
+            self.stamp = disk_stamp(self.path)
+
+            id_map_path = os.path.join(self.path, "id_map.json")
+            has_id_map = os.path.exists(id_map_path)
+            if has_id_map:
+                with open(id_map_path) as f:
+                    self.resume_vector_ids = {int(k): v for k, v in json.load(f).items()}
+            live_ids = {doc_id for ids in self.resume_vector_ids.values() for doc_id in ids}
+
+            for doc_id in self.store.index_to_docstore_id.values():
+                doc = self.store.docstore.search(doc_id)
+                if has_id_map and doc_id not in live_ids:
+                    # Deleted before the last flush but not yet compacted
+                    self.tombstones.add(doc_id)
+                    continue
+                self.text_bytes += len(getattr(doc, "page_content", ""))
+                if not has_id_map:
+                    resume_id = getattr(doc, "metadata", {}).get("resume_id")
+                    if resume_id is not None:
+                        self.resume_vector_ids.setdefault(resume_id, []).append(doc_id)
+
+            logger.info(f"📂 Loaded vector shard '{self.name}' ({self.store.index.ntotal} vectors)")
+
+
+class ShardManager:
+    """Keeps one VectorShard per user, loading lazily and evicting LRU shards"""
+
+    def __init__(self, base_dir: str, embeddings_provider: Callable[[], Any], max_memory_mb: int):
+        self.base_dir = base_dir
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self._embeddings_provider = embeddings_provider
+        self._shards: "OrderedDict[str, VectorShard]" = OrderedDict()
+        self._lock = threading.RLock()
+        # resume_id -> shard name, so resume-scoped searches know which shards to open
+        self._owners_path = os.path.join(base_dir, "owners.json")
+        self._resume_owners: Dict[int, str] = {}
+        self._owners_mtime: Optional[int] = None
+        self._refresh_owners()
+
+    @staticmethod
+    def shard_name(user_id: Optional[int]) -> str:
+        return f"user_{user_id}" if user_id is not None else SHARED_SHARD
+
+    def _lock_path(self, name: str) -> str:
+        return os.path.join(self.base_dir, f"{name}.lock")
+
+    def _owners_stat(self) -> Optional[int]:
+        try:
+            return os.stat(self._owners_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load_owners(self):
+        """Read owners.json into memory (caller holds its file lock and self._lock)"""
+        mtime = self._owners_stat()
+        owners: Dict[int, str] = {}
+        if mtime is not None:
+            try:
+                with open(self._owners_path) as f:
+                    owners = {int(k): v for k, v in json.load(f).items()}
+            except Exception as e:
+                logger.error(f"❌ Failed to read shard owners map: {str(e)}")
+                return
+        self._resume_owners = owners
+        self._owners_mtime = mtime
+
+    def _refresh_owners(self):
+        """Pick up owner changes saved by other processes"""
+        if self._owners_stat() == self._owners_mtime:
+            return
+        with file_lock(self._owners_path + ".lock", shared=True), self._lock:
+            self._load_owners()
+
+    def _save_owners(self):
+        os.makedirs(self.base_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, prefix=".owners.", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({str(k): v for k, v in self._resume_owners.items()}, f)
+            os.replace(tmp_path, self._owners_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._owners_mtime = self._owners_stat()
+
+    def _update_owners(self, update: Callable[[Dict[int, str]], Any]) -> Any:
+        """Apply update to the latest owners map and save it, under the cross-process lock"""
+        with file_lock(self._owners_path + ".lock"), self._lock:
+            if self._owners_stat() != self._owners_mtime:
+                self._load_owners()
+            result = update(self._resume_owners)
+            self._save_owners()
+            return result
+
+    def get(self, name: str, create: bool = False) -> Optional[VectorShard]:
+        """Return a shard, loading it from disk on first access or after another process saved it"""
+        shard = self._acquire(name, create=create)
+        if shard is not None:
+            self._unpin(shard)
+        return shard
+
+    def _acquire(self, name: str, create: bool = False) -> Optional[VectorShard]:
+        """
+        Return the shard pinned. self._lock is only held to look up and pin it; any
+        disk load or reload waits on the shard's file lock after it is released, so
+        a slow save in another process does not stall every other shard.
+        """
+        with self._lock:
+            shard = self._shards.get(name)
+            if shard is not None:
+                self._shards.move_to_end(name)
+                shard.pins += 1
+        if shard is not None:
+            try:
+                if not shard.dirty and shard.is_stale():
+                    with file_lock(self._lock_path(name), shared=True), shard.lock:
+                        if not shard.dirty and shard.is_stale():
+                            shard.reload(self._embeddings_provider())
+            except BaseException:
+                self._unpin(shard)
+                raise
+            return shard
+
+        path = os.path.join(self.base_dir, name)
+        if VectorShard.exists_on_disk(path):
+            with file_lock(self._lock_path(name), shared=True):
+                loaded = VectorShard.load(name, path, self._embeddings_provider())
+        elif create:
+            loaded = VectorShard(name, path)
+        else:
+            return None
+
+        with self._lock:
+            # Another thread may have loaded the same shard meanwhile; keep the first copy
+            shard = self._shards.setdefault(name, loaded)
+            self._shards.move_to_end(name)
+            shard.pins += 1
+            self._evict(keep=name)
+        return shard
+
+    def _unpin(self, shard: VectorShard):
+        with self._lock:
+            shard.pins -= 1
+
+    @contextmanager
+    def _pinned(self, name: str, create: bool = False):
+        """Get a shard and keep it resident (not evictable) until the block exits"""
+        shard = self._acquire(name, create=create)
+        try:
+            yield shard
+        finally:
+            if shard is not None:
+                self._unpin(shard)
+
+    @contextmanager
+    def _writing(self, name: str, create: bool = False):
+        """
+        Pin a shard and hold its cross-process lock for a read-modify-write: the
+        shard is reloaded if another process saved it, and saved when the block exits.
+        """
+        with self._pinned(name, create=create) as shard:
+            if shard is None:
+                yield None
+                return
+            with file_lock(self._lock_path(name)), shard.lock:
+                if shard.is_stale():
+                    shard.reload(self._embeddings_provider())
+                yield shard
+                shard.save()
+
+    def add(
+        self,
+        texts: List[str],
+        vectors: List[List[float]],
+        metadatas: List[dict],
+        ids: List[str],
+        user_id: Optional[int]
+    ):
+        """Append embedded chunks to the owner's shard and persist it"""
+        name = self.shard_name(user_id)
+        embeddings = self._embeddings_provider()
+        with self._writing(name, create=True) as shard:
+            shard.add(texts, vectors, metadatas, ids, embeddings)
+
+        def claim(owners: Dict[int, str]):
+            for metadata in metadatas:
+                owners[metadata["resume_id"]] = name
+
+        self._update_owners(claim)
+        return shard
+
+    def indexed_resume_ids(self) -> List[int]:
+        """Every resume id that has vectors in some shard"""
+        self._refresh_owners()
+        with self._lock:
+            return list(self._resume_owners.keys())
+
+    def shards_for(
+        self,
+        resume_ids: Optional[Iterable[int]] = None,
+        user_id: Optional[int] = None
+    ) -> List[Tuple[VectorShard, Optional[List[int]]]]:
+        """Resolve a search scope into (shard, resume_ids within it) pairs"""
+        if user_id is not None:
+            shard = self.get(self.shard_name(user_id))
+            if shard is None:
+                return []
+            return [(shard, list(resume_ids) if resume_ids is not None else None)]
+
+        if resume_ids is None:
+            raise ValueError("A search scope needs resume_ids or user_id")
+
+        self._refresh_owners()
+        groups: Dict[str, List[int]] = {}
+        for resume_id in resume_ids:
+            owner = self._resume_owners.get(resume_id)
+            if owner is not None:
+                groups.setdefault(owner, []).append(resume_id)
+
+        scoped = []
+        for name, ids in groups.items():
+            shard = self.get(name)
+            if shard is not None:
+                scoped.append((shard, ids))
+        return scoped
+
+    def delete_resumes(self, resume_ids: Iterable[int]) -> List[str]:
+        """Tombstone the resumes' vectors in their owning shards and persist them; returns touched shard names"""
+        resume_ids = list(resume_ids)
+
+        def release(owners: Dict[int, str]) -> Dict[str, List[int]]:
+            groups: Dict[str, List[int]] = {}
+            for resume_id in resume_ids:
+                owner = owners.pop(resume_id, None)
+                if owner is not None:
+                    groups.setdefault(owner, []).append(resume_id)
+            return groups
+
+        groups = self._update_owners(release)
+        for name, ids in groups.items():
+            with self._writing(name) as shard:
+                if shard is not None:
+                    removed = shard.delete_resumes(ids)
+                    logger.info(f"🗑️  Tombstoned {removed} vectors for {len(ids)} resumes in shard '{name}'")
+        return list(groups.keys())
+
+    def compact(self, names: Optional[Iterable[str]] = None, min_ratio: float = 0.0):
+        """Rebuild shards whose tombstone ratio exceeds min_ratio, then flush them"""
+        with self._lock:
+            targets = list(names) if names is not None else list(self._shards.keys())
+        for name in targets:
+            with self._writing(name) as shard:
+                if shard is None or not shard.tombstones or shard.tombstone_ratio < min_ratio:
+                    continue
+                shard.compact()
+
+    def _save(self, shard: VectorShard):
+        if shard.dirty:
+            with file_lock(self._lock_path(shard.name)):
+                shard.save()
+
+    def flush_shards(self, names: Iterable[str]):
+        """
+        Persist shards with unsaved changes. Writes are already saved as they
+        happen, so this only catches a change whose save failed.
+        """
+        with self._lock:
+            shards = [self._shards[name] for name in names if name in self._shards]
+        for shard in shards:
+            self._save(shard)
+
+    def flush(self, user_id: Optional[int] = None):
+        """Persist the user's shard if it has unsaved changes"""
+        self.flush_shards([self.shard_name(user_id)])
+
+    def flush_all(self):
+        # Dirty shards are never evicted, so saving outside self._lock is safe
+        with self._lock:
+            shards = list(self._shards.values())
+        for shard in shards:
+            self._save(shard)
+
+    def _evict(self, keep: Optional[str] = None):
+        """
+        Drop least recently used shards until under budget. Shards that are in use
+        or hold unsaved changes stay resident, so no write can land in a shard
+        object the manager no longer tracks (and would never flush).
+        """
+        total = sum(shard.memory_bytes for shard in self._shards.values())
+        for name in list(self._shards.keys()):
+            if total <= self.max_memory_bytes:
+                break
+            shard = self._shards[name]
+            if name == keep or shard.pins > 0 or shard.dirty:
+                continue
+            del self._shards[name]
+            total -= shard.memory_bytes
+            logger.info(f"♻️  Evicted vector shard '{name}' from memory")
@@ -0,0 +1,157 @@
+"""
+Parallel model warm-up.
+
+Loads the embeddings, reranker, summarizer and LLM on background threads at
+startup and runs one dummy inference through each, so kernel/JIT initialization
+happens before traffic arrives. `/ready` reports the result; `/health` stays a
+plain liveness check.
+
+A failed warm-up is retried with exponential backoff (capped at
+WARMUP_RETRY_MAX_SECONDS), and so is an unavailable model when it lives on a
+model server that may not be up yet, so `/ready` recovers without a restart.
+"""
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Without embeddings nothing can be indexed or searched
+REQUIRED_MODELS = ("embeddings",)
+
+_DUMMY_TEXT = "Senior Python engineer with AWS, Docker and SQL experience building data pipelines."
+
+
+def _warm_embeddings(rag_service):
+    from app.services.embedding_cache import CachedEmbeddings
+    embeddings = rag_service.embeddings
+    # Go around the embedding cache (only) so the model itself runs, through the micro-batcher
+    if isinstance(embeddings, CachedEmbeddings):
+        embeddings = embeddings.base
+    embeddings.embed_query(_DUMMY_TEXT)
+    return True
+
+
+def _warm_reranker(rag_service):
+    if not rag_service.reranker_available:
+        return False
+    rag_service.reranker.predict([[_DUMMY_TEXT, _DUMMY_TEXT]], show_progress_bar=False)
+    return True
+
+
+def _warm_summarizer(rag_service):
+    if not rag_service.summarizer_available:
+        return False
+    rag_service.summarizer(_DUMMY_TEXT, max_length=16, min_length=4, do_sample=False)
+    return True
+
+
+def _warm_llm(rag_service):
+    if not rag_service.llm_available or not rag_service.llm:
+        return False
+    rag_service.llm(_DUMMY_TEXT, max_new_tokens=1, return_full_text=False)
+    return True
+
+
+WARMUP_TASKS: Dict[str, Callable[[Any], bool]] = {
+    "embeddings": _warm_embeddings,
+    "reranker": _warm_reranker,
+    "summarizer": _warm_summarizer,
+    "llm": _warm_llm,
+}
+
+
+class ModelWarmup:
+    """Tracks per-model warm-up state: pending, loading, retrying, ready, unavailable or failed"""
+
+    def __init__(self, rag_service, models: List[str]):
+        self.rag_service = rag_service
+        self.models = [name for name in models if name in WARMUP_TASKS]
+        self._state: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in self.models}
+        self._lock = threading.Lock()
+        self._started = False
+        self._stop = threading.Event()
+        self._announced = False
+
+    def start(self):
+        """Load every model on its own thread; returns immediately"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        logger.info(f"🔥 Warming up models in parallel: {', '.join(self.models)}")
+        # Daemon threads: a model still being retried must not hold up process exit
+        for name in self.models:
+            threading.Thread(target=self._run, args=(name,), name=f"warmup-{name}", daemon=True).start()
+
+    def stop(self):
+        """Abandon pending retries"""
+        self._stop.set()
+
+    def _run(self, name: str):
+        from app.config import settings
+        delay = 1.0
+        status = self._attempt(name, "loading")
+        while True:
+            self._announce_ready()
+            retry = status == "failed" or (status == "unavailable" and self.rag_service.model_client is not None)
+            if not retry or settings.WARMUP_RETRY_MAX_SECONDS <= 0:
+                return
+            delay = min(delay, settings.WARMUP_RETRY_MAX_SECONDS)
+            with self._lock:
+                self._state[name]["retry_in"] = delay
+            logger.info(f"   🔁 Retrying {name} warm-up in {delay:.0f}s")
+            if self._stop.wait(delay):
+                return
+            delay *= 2
+            status = self._attempt(name, "retrying")
+
+    def _attempt(self, name: str, running_status: str) -> str:
+        """Run one warm-up; returns the resulting status"""
+        self._set(name, status=running_status)
+        start = time.perf_counter()
+        try:
+            loaded = WARMUP_TASKS[name](self.rag_service)
+            seconds = round(time.perf_counter() - start, 2)
+            if loaded:
+                self._set(name, status="ready", seconds=seconds)
+                logger.info(f"   ✅ {name} warm in {seconds}s")
+                return "ready"
+            self._set(name, status="unavailable", seconds=seconds)
+            if running_status == "loading":
+                logger.warning(f"   ⚠️  {name} not available - related features will be limited")
+            return "unavailable"
+        except Exception as e:
+            self._set(name, status="failed", seconds=round(time.perf_counter() - start, 2), error=str(e))
+            logger.error(f"   ❌ {name} warm-up failed: {str(e)}")
+            return "failed"
+
+    def _announce_ready(self):
+        with self._lock:
+            if self._announced:
+                return
+        if self.ready:
+            with self._lock:
+                self._announced = True
+            logger.info("🚀 RAG Service ready!")
+
+    def _set(self, name: str, **state):
+        with self._lock:
+            self._state[name] = state
+
+    @property
+    def ready(self) -> bool:
+        """First warm-up attempts finished and every required model is hot (retries don't block)"""
+        with self._lock:
+            if any(state["status"] in ("pending", "loading") for state in self._state.values()):
+                return False
+            return all(
+                self._state[name]["status"] == "ready"
+                for name in REQUIRED_MODELS if name in self._state
+            )
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {name: dict(state) for name, state in self._state.items()}
+        return {"ready": self.ready, "models": models}
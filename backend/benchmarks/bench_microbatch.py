@@ -0,0 +1,101 @@
+"""
+Benchmark: concurrent chat-query model work with and without micro-batching.
+
+Each simulated chat query embeds its question and reranks k passages, like
+RAGService.query. N queries run on N threads at once; the direct path calls the
+models per query, the batched path goes through MicroBatcher /
+BatchedEmbeddings, which coalesce the concurrent calls into shared forward passes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_microbatch --queries 20 --k 10
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+
+EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+def make_queries(count: int, k: int, seed: int = 5):
+    rng = random.Random(seed)
+    vocab = ("python django aws docker kubernetes sql react etl spark pandas team led built "
+             "designed pipelines services platform customers scaled migrated reduced latency").split()
+    queries = []
+    for i in range(count):
+        question = f"Which candidates have {rng.choice(vocab)} and {rng.choice(vocab)} experience? ({i})"
+        passages = [" ".join(rng.choice(vocab) for _ in range(150)) for _ in range(k)]
+        queries.append((question, passages))
+    return queries
+
+
+def run_concurrent(queries, embed_query, rerank):
+    """Run every query on its own thread; returns (wall seconds, per-query latencies)"""
+    latencies = [0.0] * len(queries)
+    barrier = threading.Barrier(len(queries))
+
+    def worker(i, question, passages):
+        barrier.wait()
+        start = time.perf_counter()
+        embed_query(question)
+        rerank([[question, passage] for passage in passages])
+        latencies[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=worker, args=(i, q, p)) for i, (q, p) in enumerate(queries)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(label: str, wall: float, latencies, count: int):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{label:<14} {wall:8.3f}s  {count / wall:8.1f} queries/sec  "
+          f"p50 {statistics.median(ordered) * 1000:8.1f}ms  p95 {p95 * 1000:8.1f}ms")
+
+
+def main():
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from sentence_transformers import CrossEncoder
+    from app.services.batching import MicroBatcher, BatchedEmbeddings
+    from app.services.rerank_engine import RerankEngine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs={"device": "cpu"},
+        encode_kwargs={"normalize_embeddings": True}
+    )
+    engine = RerankEngine(CrossEncoder(RERANKER_MODEL, max_length=512))
+    queries = make_queries(args.queries, args.k)
+
+    # Warm up both models so loading is not timed
+    embeddings.embed_query("warm up")
+    engine.predict([["warm up", "warm up"]])
+
+    direct = run_concurrent(queries, embeddings.embed_query, engine.predict)
+
+    batched_embeddings = BatchedEmbeddings(embeddings, args.max_batch, args.window_ms)
+    rerank_batcher = MicroBatcher("rerank", engine.predict, args.max_batch, args.window_ms)
+    batched = run_concurrent(queries, batched_embeddings.embed_query, rerank_batcher.submit)
+
+    print(f"{args.queries} concurrent queries, {args.k} passages each")
+    report("direct", *direct, args.queries)
+    report("micro-batched", *batched, args.queries)
+    print(f"speedup        {direct[0] / batched[0]:8.2f}x")
+    print(f"forward passes  embed_query {batched_embeddings.queries.batches}, rerank {rerank_batcher.batches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark: PDF page loading on born-digital, scanned and mixed fixtures.
+
+Compares the old path (PyPDFLoader, then - if the whole document has fewer
+than 100 characters - rasterize every page at pdf2image's default DPI in color
+and OCR them one after another) with RAGService._load_pdf_pages, which OCRs
+only pages without a text layer, one grayscale page at a time at OCR_DPI on
+OCR_WORKERS threads. The parse artifact cache is not involved.
+
+Fixtures are generated into a temp directory unless --fixtures points at a
+directory with born_digital/, scanned/ and mixed/ subdirectories of PDFs:
+    born_digital  text-layer pages (hand-written PDF with Helvetica text)
+    scanned       the same pages rendered to images (no text layer)
+    mixed         born-digital pages with one scanned page in the middle
+
+Needs tesseract and poppler installed, like the OCR fallback itself.
+
+Usage (from backend/):
+    python -m benchmarks.bench_ocr --files 5 --pages 3 --dpi 150 200 300
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+KINDS = ("born_digital", "scanned", "mixed")
+
+
+def make_lines(rng: random.Random, count: int = 40):
+    vocab = ("python django aws docker kubernetes sql react etl spark pandas airflow team led built "
+             "designed pipelines services platform customers scaled migrated reduced latency").split()
+    return [" ".join(rng.choice(vocab) for _ in range(10)) for _ in range(count)]
+
+
+def write_text_pdf(path: str, pages):
+    """Minimal born-digital PDF: one Helvetica text block per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 11 Tf 14 TL 50 780 Td " + " ".join(
+            "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") Tj T*" for line in lines
+        ) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_scanned_pdf(path: str, pages, dpi: int = 200):
+    """Image-only PDF: each page's text drawn onto an RGB bitmap, as a scanner would produce"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.load_default()
+    scale = dpi / 72
+    images = []
+    for lines in pages:
+        image = Image.new("RGB", (int(612 * scale), int(842 * scale)), "white")
+        draw = ImageDraw.Draw(image)
+        for i, line in enumerate(lines):
+            draw.text((50 * scale, (62 + 14 * i) * scale), line, fill="black", font=font)
+        images.append(image)
+    images[0].save(path, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+
+
+def write_mixed_pdf(path: str, text_path: str, scanned_path: str):
+    """Born-digital pages with the middle page swapped for its scanned version"""
+    from pypdf import PdfReader, PdfWriter
+
+    text_pages = PdfReader(text_path).pages
+    scanned_pages = PdfReader(scanned_path).pages
+    middle = len(text_pages) // 2
+    writer = PdfWriter()
+    for i, page in enumerate(text_pages):
+        writer.add_page(scanned_pages[i] if i == middle else page)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+def make_fixtures(directory: str, files: int, pages: int, seed: int = 3):
+    rng = random.Random(seed)
+    for kind in KINDS:
+        os.makedirs(os.path.join(directory, kind), exist_ok=True)
+    for i in range(files):
+        content = [make_lines(rng) for _ in range(pages)]
+        text_path = os.path.join(directory, "born_digital", f"resume_{i}.pdf")
+        scanned_path = os.path.join(directory, "scanned", f"resume_{i}.pdf")
+        write_text_pdf(text_path, content)
+        write_scanned_pdf(scanned_path, content)
+        write_mixed_pdf(os.path.join(directory, "mixed", f"resume_{i}.pdf"), text_path, scanned_path)
+
+
+def load_legacy(file_path: str):
+    """The previous process_pdf loading: whole-document threshold, all pages, default DPI, sequential"""
+    import pytesseract
+    from pdf2image import convert_from_path
+    from langchain_community.document_loaders import PyPDFLoader
+
+    documents = PyPDFLoader(file_path).load()
+    text = "".join(d.page_content for d in documents)
+    pages_ocrd = 0
+    if len(text.strip()) < 100:
+        images = convert_from_path(file_path)
+        text = "".join(pytesseract.image_to_string(image) + "\n" for image in images)
+        pages_ocrd = len(images)
+    return len(text), pages_ocrd
+
+
+def load_fast(service, file_path: str):
+    pages, _ = service._load_pdf_pages(file_path)
+    return sum(len(page.page_content) for page in pages), sum(1 for page in pages if page.metadata.get("ocr"))
+
+
+def run(paths, load):
+    """Returns (per-file seconds, total chars, total pages OCR'd)"""
+    seconds, chars, ocrd = [], 0, 0
+    for path in paths:
+        start = time.perf_counter()
+        n_chars, n_ocrd = load(path)
+        seconds.append(time.perf_counter() - start)
+        chars += n_chars
+        ocrd += n_ocrd
+    return seconds, chars, ocrd
+
+
+def report(label: str, result):
+    seconds, chars, ocrd = result
+    print(f"  {label:<22} {sum(seconds):8.2f}s total  {statistics.median(seconds) * 1000:8.1f}ms/file  "
+          f"{ocrd:4d} pages OCR'd  {chars:8d} chars")
+
+
+def main():
+    from app.config import settings
+    from app.services.rag_service import RAGService
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default="", help="Directory with born_digital/, scanned/ and mixed/ PDFs")
+    parser.add_argument("--files", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--dpi", type=int, nargs="+", default=[settings.OCR_DPI])
+    args = parser.parse_args()
+
+    directory = args.fixtures or tempfile.mkdtemp(prefix="bench_ocr_")
+    if not args.fixtures:
+        make_fixtures(directory, args.files, args.pages)
+
+    service = RAGService()
+    for kind in KINDS:
+        kind_dir = os.path.join(directory, kind)
+        paths = sorted(os.path.join(kind_dir, name) for name in os.listdir(kind_dir) if name.endswith(".pdf"))
+        if not paths:
+            continue
+        print(f"{kind}: {len(paths)} files")
+        report("legacy", run(paths, load_legacy))
+        for dpi in args.dpi:
+            settings.OCR_DPI = dpi
+            report(f"page-level @ {dpi} DPI", run(paths, lambda path: load_fast(service, path)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark: CrossEncoder throughput, plain reranker.predict(pairs) vs. RerankEngine
+(length-sorted buckets, token-budgeted batch sizes, sequences capped at max tokens).
+
+Usage (from backend/):
+    python -m benchmarks.bench_rerank --pairs 200 --repeats 3
+"""
+import argparse
+import random
+import time
+
+MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+def make_pairs(count: int, seed: int = 7):
+    """Job query + passages of mixed length (short chunks to full resumes)"""
+    rng = random.Random(seed)
+    vocab = ("python django aws docker kubernetes sql react etl spark pandas team led built "
+             "designed pipelines services platform customers scaled migrated reduced latency").split()
+    query = "Senior Python Engineer\nBuild data pipelines on AWS with Docker and Kubernetes.\nRequirements:\nPython\nSQL\nSpark"
+    pairs = []
+    for _ in range(count):
+        words = rng.choice([40, 120, 300, 800, 2000])
+        pairs.append([query, " ".join(rng.choice(vocab) for _ in range(words))])
+    return pairs
+
+
+def timed(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    from sentence_transformers import CrossEncoder
+    from app.services.rerank_engine import RerankEngine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--tokens-per-batch", type=int, default=16384)
+    args = parser.parse_args()
+
+    pairs = make_pairs(args.pairs)
+    model = CrossEncoder(MODEL, max_length=args.max_tokens)
+    engine = RerankEngine(model, args.batch_size, args.max_tokens, args.tokens_per_batch)
+
+    # Baseline mirrors the old call: 2000-character passages, library defaults
+    baseline_pairs = [[q, p[:2000]] for q, p in pairs]
+    baseline = timed(lambda: model.predict(baseline_pairs, show_progress_bar=False), args.repeats)
+    bucketed = timed(lambda: engine.predict(pairs), args.repeats)
+
+    print(f"pairs: {len(pairs)}  (best of {args.repeats})")
+    print(f"reranker.predict : {baseline:8.3f}s  {len(pairs) / baseline:8.1f} pairs/sec")
+    print(f"RerankEngine     : {bucketed:8.3f}s  {len(pairs) / bucketed:8.1f} pairs/sec")
+    print(f"speedup          : {baseline / bucketed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
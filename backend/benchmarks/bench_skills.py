@@ -0,0 +1,97 @@
+"""
+Benchmark: skill extraction throughput in MB/s.
+
+Compares the old extractor (one compiled \\b...\\b regex per skill term, each
+searched over the text in turn) with SkillExtractor's single trie-factored
+pattern, on the bundled taxonomy and on the taxonomy padded with synthetic
+skills to show how each scales with taxonomy size.
+
+Usage (from backend/):
+    python -m benchmarks.bench_skills --mb 2 --synthetic 1000 5000
+"""
+import re
+import json
+import time
+import random
+import string
+import argparse
+
+from app.services.skill_extractor import SkillExtractor, DEFAULT_TAXONOMY_PATH, normalize
+
+
+def make_text(taxonomy, size_mb: float, seed: int = 9) -> str:
+    """Resume-like prose with a skill mention every ~20 words"""
+    rng = random.Random(seed)
+    filler = ("led built designed scaled migrated reduced latency team customers platform services "
+              "pipelines experience years senior engineer responsible delivered improved").split()
+    terms = [term for skill, aliases in taxonomy.items() for term in [skill, *aliases]]
+    words, size = [], 0
+    target = int(size_mb * 1024 * 1024)
+    while size < target:
+        word = rng.choice(terms) if rng.random() < 0.05 else rng.choice(filler)
+        if rng.random() < 0.1:
+            word = word.capitalize() + rng.choice([",", ".", ";", ""])
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def synthetic_taxonomy(count: int, seed: int = 13):
+    rng = random.Random(seed)
+    skills = {}
+    while len(skills) < count:
+        name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        if rng.random() < 0.3:
+            name += " " + "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+        skills[name] = [name + "js"] if rng.random() < 0.2 else []
+    return skills
+
+
+class LegacyExtractor:
+    """The previous approach: a separate \\b-delimited regex per term"""
+
+    def __init__(self, taxonomy):
+        self.patterns = {
+            normalize(term): (normalize(skill), re.compile(r"\b" + re.escape(normalize(term)) + r"\b"))
+            for skill, aliases in taxonomy.items() for term in [skill, *aliases]
+        }
+
+    def extract(self, text: str):
+        txt = text.lower()
+        return sorted({skill for skill, pattern in self.patterns.values() if pattern.search(txt)})
+
+
+def throughput(extract, text: str, repeat: int) -> float:
+    extract(text)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract(text)
+    seconds = (time.perf_counter() - start) / repeat
+    return len(text.encode("utf-8")) / (1024 * 1024) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--taxonomy", default=DEFAULT_TAXONOMY_PATH)
+    parser.add_argument("--mb", type=float, default=1.0, help="Size of the generated text")
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[1000, 5000], help="Extra synthetic skills")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.taxonomy, "r", encoding="utf-8") as f:
+        base = json.load(f)["skills"]
+
+    print(f"{'skills':>8} {'terms':>8} {'legacy MB/s':>12} {'single-pass MB/s':>17} {'speedup':>8}")
+    for extra in [0, *args.synthetic]:
+        taxonomy = {**base, **synthetic_taxonomy(extra)} if extra else base
+        text = make_text(taxonomy, args.mb)
+        single = SkillExtractor(taxonomy)
+        legacy = LegacyExtractor(taxonomy)
+        legacy_rate = throughput(legacy.extract, text, args.repeat)
+        single_rate = throughput(single.extract, text, args.repeat)
+        print(f"{single.skill_count:8d} {len(single.terms):8d} {legacy_rate:12.2f} {single_rate:17.2f} "
+              f"{single_rate / legacy_rate:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: wall-clock of the selection-summary stage for the top-N candidates.
+
+Compares the old path (one text-generation pipeline call per candidate with the
+pipeline's max_new_tokens=600) with the batched stage (padded batches of
+LLM_SUMMARY_BATCH_SIZE, LLM_SUMMARY_MAX_NEW_TOKENS budget).
+
+Usage (from backend/):
+    python -m benchmarks.bench_summaries --top-n 5 10 20
+"""
+import argparse
+import random
+import time
+
+JOB_DESCRIPTION = (
+    "Senior Python Engineer\nBuild data pipelines on AWS with Docker and Kubernetes.\n"
+    "Requirements:\nPython\nSQL\nSpark\nAirflow"
+)
+
+
+def make_candidates(count: int, seed: int = 11):
+    """Ranked candidate dicts shaped like rank_resumes_with_summaries' top_candidates"""
+    rng = random.Random(seed)
+    vocab = ("python django aws docker kubernetes sql react etl spark pandas airflow team led built "
+             "designed pipelines services platform customers scaled migrated reduced latency").split()
+    return [
+        {
+            "resume_id": i,
+            "rerank_score": 0.9 - i * 0.01,
+            "text": " ".join(rng.choice(vocab) for _ in range(300)),
+            "skills": rng.sample(["Python", "AWS", "Docker", "Kubernetes", "SQL", "Spark"], 3)
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def run_sequential(service, candidates) -> float:
+    start = time.perf_counter()
+    for cand in candidates:
+        service.llm(service._selection_summary_prompt(JOB_DESCRIPTION, cand["text"]))
+    return time.perf_counter() - start
+
+
+def run_batched(service, candidates) -> float:
+    start = time.perf_counter()
+    service.generate_selection_summaries(JOB_DESCRIPTION, candidates)
+    return time.perf_counter() - start
+
+
+def main():
+    from app.config import settings
+    from app.services.rag_service import RAGService
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-n", type=int, nargs="+", default=[5, 10, 20])
+    args = parser.parse_args()
+
+    # Time generation itself, not llm_outputs lookups
+    settings.LLM_OUTPUT_CACHE_ENABLED = False
+    service = RAGService()
+    if not service.llm_available:
+        raise SystemExit(f"LLM {settings.LLM_REPO_ID} could not be loaded")
+
+    # Warm up so model loading is not timed
+    service.generate_selection_summaries(JOB_DESCRIPTION, make_candidates(1))
+
+    print(f"model: {settings.LLM_REPO_ID}  batch size: {settings.LLM_SUMMARY_BATCH_SIZE}  "
+          f"max_new_tokens: {settings.LLM_SUMMARY_MAX_NEW_TOKENS}")
+    print(f"{'top_n':>6} | {'sequential (s)':>14} | {'batched (s)':>11} | {'speedup':>7}")
+    print("-" * 50)
+    for top_n in args.top_n:
+        candidates = make_candidates(top_n)
+        sequential = run_sequential(service, candidates)
+        batched = run_batched(service, candidates)
+        print(f"{top_n:>6} | {sequential:>14.2f} | {batched:>11.2f} | {sequential / batched:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: per-file overhead of adding resumes to FAISS.
+
+Compares the old path (FAISS.from_documents + merge_from for every PDF) with the
+batched path (one embed pass for the whole upload, appended in place to the
+shard's index and docstore).
+
+Usage (from backend/):
+    python -m benchmarks.bench_vector_add --files 10 100 1000
+    python -m benchmarks.bench_vector_add --files 10 100 --real-embeddings
+"""
+import argparse
+import tempfile
+import time
+
+CHUNKS_PER_RESUME = 4
+CHUNK_CHARS = 1000
+
+
+def make_resumes(count: int):
+    """Synthetic (resume_id, chunks) pairs shaped like process_pdf output"""
+    from langchain_core.documents import Document
+    words = "python docker kubernetes aws sql react machine learning etl spark team lead".split()
+    resumes = []
+    for resume_id in range(1, count + 1):
+        chunks = []
+        for idx in range(CHUNKS_PER_RESUME):
+            text = " ".join(words[(resume_id + idx + i) % len(words)] for i in range(CHUNK_CHARS // 7))
+            chunks.append(Document(
+                page_content=text[:CHUNK_CHARS],
+                metadata={"source": f"resume_{resume_id}.pdf", "resume_id": resume_id, "chunk_index": idx}
+            ))
+        resumes.append((resume_id, chunks))
+    return resumes
+
+
+def run_per_file_merge(resumes, embeddings) -> float:
+    from langchain_community.vectorstores import FAISS
+    start = time.perf_counter()
+    store = None
+    for resume_id, chunks in resumes:
+        ids = [f"{resume_id}:{idx}" for idx in range(len(chunks))]
+        new_store = FAISS.from_documents(documents=chunks, embedding=embeddings, ids=ids)
+        if store is None:
+            store = new_store
+        else:
+            store.merge_from(new_store)
+    return time.perf_counter() - start
+
+
+def run_batched(resumes, embeddings) -> float:
+    from app.services.vector_shards import VectorShard
+    start = time.perf_counter()
+    documents = [doc for _, chunks in resumes for doc in chunks]
+    ids = [f"{doc.metadata['resume_id']}:{doc.metadata['chunk_index']}" for doc in documents]
+    texts = [doc.page_content for doc in documents]
+    vectors = embeddings.embed_documents(texts)
+    shard = VectorShard("bench", tempfile.mkdtemp())
+    shard.add(texts, vectors, [doc.metadata for doc in documents], ids, embeddings)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="Use sentence-transformers/all-mpnet-base-v2 instead of fake embeddings")
+    args = parser.parse_args()
+
+    if args.real_embeddings:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(
+            model_name="sentence-transformers/all-mpnet-base-v2",
+            model_kwargs={"device": "cpu"},
+            encode_kwargs={"normalize_embeddings": True}
+        )
+    else:
+        from langchain_community.embeddings import FakeEmbeddings
+        embeddings = FakeEmbeddings(size=768)
+
+    print(f"{'PDFs':>6} | {'merge total (s)':>15} | {'merge/file (ms)':>15} | {'batch total (s)':>15} | {'batch/file (ms)':>15}")
+    print("-" * 80)
+    for count in args.files:
+        resumes = make_resumes(count)
+        merge_seconds = run_per_file_merge(resumes, embeddings)
+        batch_seconds = run_batched(resumes, embeddings)
+        print(
+            f"{count:>6} | {merge_seconds:>15.3f} | {merge_seconds / count * 1000:>15.2f} | "
+            f"{batch_seconds:>15.3f} | {batch_seconds / count * 1000:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
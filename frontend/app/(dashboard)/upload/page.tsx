@@ -1,12 +1,14 @@
 'use client'
 
-import { useState, useCallback } from 'react'
+import { useState, useCallback, useEffect } from 'react'
 import { Upload, FileText, X, Loader2, CheckCircle2, ArrowRight, AlertTriangle } from 'lucide-react'
 import { useDropzone } from 'react-dropzone'
-import { resumeApi } from '@/lib/api'
+import { resumeApi, RankedCandidate } from '@/lib/api'
 import Link from 'next/link'
 import { Button } from '@/components/ui/button'
 
+const SUMMARY_POLL_MS = 2000
+
 export default function UploadPage() {
   const [files, setFiles] = useState<File[]>([])
   const [jobTitle, setJobTitle] = useState('')
@@ -17,6 +19,46 @@ export default function UploadPage() {
   const [uploadedFiles, setUploadedFiles] = useState<string[]>([])
   const [error, setError] = useState<string | null>(null)
   const [showSuccessNotification, setShowSuccessNotification] = useState(false)
+  const [candidates, setCandidates] = useState<RankedCandidate[]>([])
+
+  // Poll background summary generation until every ranked candidate has one
+  const pendingMatchIds = candidates
+    .filter(c => c.summary_status === 'pending')
+    .map(c => c.match_id)
+  const pendingKey = pendingMatchIds.join(',')
+
+  useEffect(() => {
+    if (!pendingKey) return
+    const matchIds = pendingKey.split(',').map(Number)
+    let cancelled = false
+    let timer: ReturnType<typeof setTimeout>
+
+    const poll = async () => {
+      try {
+        const response = await resumeApi.getMatchSummaries(matchIds)
+        if (cancelled) return
+        const states = new Map(response.data.matches.map(m => [m.match_id, m]))
+        setCandidates(prev => prev.map((c): RankedCandidate => {
+          const state = states.get(c.match_id)
+          // Matches deleted meanwhile are no longer returned; stop waiting for them
+          if (!state) return c.summary_status === 'pending' ? { ...c, summary_status: 'ready' } : c
+          return state.summary_status === 'ready'
+            ? { ...c, summary: state.summary, summary_status: 'ready' }
+            : c
+        }))
+        if (response.data.complete) return
+      } catch (err) {
+        console.error('❌ Summary poll error:', err)
+      }
+      if (!cancelled) timer = setTimeout(poll, SUMMARY_POLL_MS)
+    }
+
+    timer = setTimeout(poll, SUMMARY_POLL_MS)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [pendingKey])
 
   const onDrop = useCallback((acceptedFiles: File[]) => {
     // Filter out duplicates based on filename (frontend only)
@@ -59,6 +101,7 @@ export default function UploadPage() {
     setIsProcessing(true)
     setError(null)
     setShowSuccessNotification(false)
+    setCandidates([])
 
     try {
       console.log('🚀 Starting resume upload and matching...')
@@ -78,6 +121,8 @@ export default function UploadPage() {
 
       // Set uploaded files from response
       setUploadedFiles(files.map(f => f.name))
+      // Summaries arrive in the background; pending ones are polled above
+      setCandidates(response.data.top_candidates)
 
       // Show success notification
       setShowSuccessNotification(true)
@@ -363,6 +408,38 @@ export default function UploadPage() {
             </ul>
           </div>
 
+          {candidates.length > 0 && (
+            <div className="bg-primary-bg rounded-3xl shadow-sm p-6">
+              <div className="flex items-center justify-between mb-4">
+                <h3 className="text-lg font-bold text-text-primary">Top Candidates</h3>
+                {pendingMatchIds.length > 0 && (
+                  <span className="flex items-center gap-1.5 text-xs text-text-secondary">
+                    <Loader2 className="w-3.5 h-3.5 animate-spin" />
+                    {pendingMatchIds.length} summar{pendingMatchIds.length > 1 ? 'ies' : 'y'} pending
+                  </span>
+                )}
+              </div>
+              <ol className="space-y-3">
+                {candidates.map((candidate) => (
+                  <li key={candidate.match_id} className="p-3 rounded-xl bg-secondary-bg">
+                    <div className="flex items-center justify-between text-sm">
+                      <span className="font-bold text-text-primary">#{candidate.rank} · Resume {candidate.resume_id}</span>
+                      <span className="font-medium text-primary">{(candidate.score * 100).toFixed(1)}%</span>
+                    </div>
+                    {candidate.summary_status === 'ready' ? (
+                      <p className="mt-1 text-xs text-text-secondary">{candidate.summary}</p>
+                    ) : (
+                      <p className="mt-1 flex items-center gap-1.5 text-xs text-text-tertiary">
+                        <Loader2 className="w-3 h-3 animate-spin" />
+                        Generating summary...
+                      </p>
+                    )}
+                  </li>
+                ))}
+              </ol>
+            </div>
+          )}
+
           {uploadedFiles.length > 0 && (
             <div className="bg-gradient-to-br from-secondary/10 to-secondary/5 dark:from-secondary/20 dark:to-secondary/10 rounded-xl shadow-sm border-2 border-secondary/30 p-6">
               <div className="flex items-start gap-3">
@@ -115,6 +115,36 @@ export interface Match {
   resume?: Resume
 }
 
+export interface RankedCandidate {
+  rank: number
+  resume_id: number
+  match_id: number
+  score: number
+  summary: string | null
+  summary_status: 'pending' | 'ready'
+}
+
+export interface UploadAndRankResponse {
+  message: string
+  job_id: number
+  total_resumes: number
+  ranked_count: number
+  summaries_stream: string
+  top_candidates: RankedCandidate[]
+}
+
+export interface MatchSummaryState {
+  match_id: number
+  resume_id: number
+  summary_status: 'pending' | 'ready'
+  summary: string | null
+}
+
+export interface MatchSummariesResponse {
+  complete: boolean
+  matches: MatchSummaryState[]
+}
+
 export interface DashboardStats {
   total_resumes: number
   total_jobs: number
@@ -227,7 +257,7 @@ export const resumeApi = {
       formData.append('top_n', jobDetails.top_n.toString())
     }
 
-    return api.post('/resumes/upload-and-rank', formData, {
+    return api.post<UploadAndRankResponse>('/resumes/upload-and-rank', formData, {
       headers: { 'Content-Type': 'multipart/form-data' },
     })
   },
@@ -250,6 +280,11 @@ export const resumeApi = {
   getResumeMatches: async (resumeId: number) => {
     return api.get<Match[]>(`/resumes/${resumeId}/matches`)
   },
+
+  // Poll background summary generation for matches returned by upload-and-rank
+  getMatchSummaries: async (matchIds: number[]) => {
+    return api.get<MatchSummariesResponse>(`/resumes/matches/summaries?match_ids=${matchIds.join(',')}`)
+  },
 }
 
 // Job API